@@ -2,21 +2,30 @@
 # SPDX-License-Identifier: Apache-2.0
 """A2A agent."""
 
+import asyncio
 import logging
+import time
 from collections.abc import AsyncIterable
 from typing import Any, Dict, Literal
 
-from identityservice.auth.httpx import IdentityServiceAuth
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import StructuredTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel
 
+from checkpointer import BoundedSqliteSaver, create_checkpointer
+from fast_path import FastPathRouter
+from history import HistoryPolicy
+from llm_cache import LLMResponseCache
+from metrics import LLMMetricsCallback
+from token_cache import CachedIdentityServiceAuth
+from tool_limiter import ToolLimiter
+
 logger = logging.getLogger(__name__)
 
-memory = MemorySaver()
+MODEL_NAME = "gpt-3.5-turbo"
 
 
 # pylint: disable=too-few-public-methods
@@ -27,6 +36,24 @@ class ResponseFormat(BaseModel):
     message: str
 
 
+def respond(status: str, message: str) -> str:
+    """Send the final response to the user and end the turn.
+
+    Call this tool alone, once the request is complete, fails or needs more information from the user.
+    """
+    return ResponseFormat(status=status, message=message).model_dump_json()
+
+
+# Modes producing the ResponseFormat of a turn:
+# "tool": the model ends the turn by calling the respond tool, no extra LLM call
+# "native": the model ends the turn with a JSON-schema constrained answer, no extra LLM call,
+#           needs a model supporting json_schema structured outputs, which MODEL_NAME does not
+# "legacy": an extra structured-output LLM call after the ReAct loop
+STRUCTURED_RESPONSE_MODES = ("tool", "native", "legacy")
+
+RESPOND_TOOL_NAME = "respond"
+
+
 class CurrencyAgent:
     """A2A agent for currency conversion."""
 
@@ -45,36 +72,212 @@ class CurrencyAgent:
         "Set response status to completed if the request is complete."
     )
 
+    RESPOND_INSTRUCTION = (
+        " Always end your turn by calling the 'respond' tool with the status and the message for the user. "
+    )
+
+    NATIVE_INSTRUCTION = (
+        " When you are done with the tools, answer with a JSON object with the status and the message for the user. "
+    )
+
     def __init__(
         self,
         azure_openai_endpoint,
         azure_openai_api_key,
         currency_exchange_mcp_server_url,
+        tools_refresh_interval: float = 300.0,
+        checkpointer_url: str = "memory",
+        max_checkpoints_per_thread: int = 10,
+        thread_ttl: float = 86400.0,
+        compaction_interval: float = 300.0,
+        history_max_messages: int = 20,
+        history_max_tokens: int = 2000,
+        history_tool_message_max_chars: int = 200,
+        mcp_max_concurrency: int = 16,
+        tool_max_concurrency: int = 8,
+        fast_path_enabled: bool = True,
+        llm_cache_max_size: int = 1024,
+        llm_cache_ttl: float = 3600.0,
+        llm_cache_rate_ttl: float = 120.0,
+        llm_cache_rate_max_age: float = 60.0,
+        llm_cache_semantic_threshold: float = 0.0,
+        structured_response_mode: str = "tool",
     ) -> None:
         """Initialize the agent with the Azure OpenAI model and tools."""
         self.azure_openai_endpoint = azure_openai_endpoint
         self.azure_openai_api_key = azure_openai_api_key
         self.currency_exchange_mcp_server_url = currency_exchange_mcp_server_url
+        self.tools_refresh_interval = tools_refresh_interval
+        self.checkpointer_url = checkpointer_url
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.thread_ttl = thread_ttl
+        self.compaction_interval = compaction_interval
+        if structured_response_mode not in STRUCTURED_RESPONSE_MODES:
+            raise ValueError(
+                f"Unsupported structured response mode: {structured_response_mode}"
+            )
+        self.structured_response_mode = structured_response_mode
+        self.history_policy = HistoryPolicy(
+            max_messages=history_max_messages,
+            max_tokens=history_max_tokens,
+            tool_message_max_chars=history_tool_message_max_chars,
+        )
+
+        # Tool calls of a turn run concurrently, bounded per tool and per MCP Server
+        self.tool_limiter = ToolLimiter(max_concurrency_per_tool=tool_max_concurrency)
+        self.tool_limiter.add_downstream("currency_exchange_mcp", mcp_max_concurrency)
+
+        # Simple rate queries are answered without the LLM
+        self.fast_path = FastPathRouter() if fast_path_enabled else None
+
+        # Repeated prompts are answered from the cache, 0 entries to disable
+        self.llm_cache = (
+            LLMResponseCache(
+                max_size=llm_cache_max_size,
+                ttl=llm_cache_ttl,
+                rate_ttl=llm_cache_rate_ttl,
+                rate_max_age=llm_cache_rate_max_age,
+                semantic_threshold=llm_cache_semantic_threshold,
+            )
+            if llm_cache_max_size > 0
+            else None
+        )
 
         self.model = None
         self.tools = None
         self.graph = None
+        self.checkpointer = None
+
+        self._init_lock = asyncio.Lock()
+        self._tools_loaded_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+        self._compaction_task: asyncio.Task | None = None
+
+    async def ensure_initialized(self):
+        """Initialize the model, tools and graph once, refreshing the tools in the background when due."""
+        if self.graph is None:
+            async with self._init_lock:
+                if self.graph is None:
+                    await self.init_model_and_tools()
+            return
+
+        refresh_due = (
+            self.tools_refresh_interval > 0
+            and time.monotonic() - self._tools_loaded_at > self.tools_refresh_interval
+        )
+        if refresh_due and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self.refresh_tools())
+
+    async def refresh_tools(self):
+        """Reload the tools from the MCP Server and swap in a new graph, keeping the current one on failure."""
+        # pylint: disable=broad-exception-caught
+        async with self._init_lock:
+            try:
+                await self.init_model_and_tools()
+            except Exception as e:
+                # Retry on the next refresh interval
+                self._tools_loaded_at = time.monotonic()
+                logger.error("Failed to refresh the MCP tools: %s", e)
 
     async def init_model_and_tools(self):
         """Initialize the model and tools for the agent."""
+        if self.model is None:
+            self.model = self._create_model()
+
+        if self.checkpointer is None:
+            self.checkpointer = await create_checkpointer(
+                self.checkpointer_url,
+                max_checkpoints_per_thread=self.max_checkpoints_per_thread,
+                thread_ttl=self.thread_ttl,
+            )
+            if isinstance(self.checkpointer, BoundedSqliteSaver):
+                self._compaction_task = asyncio.create_task(
+                    self.checkpointer.run_compaction(self.compaction_interval)
+                )
+
+        self.tools = await self._load_tools()
+        self.graph = self._create_graph(self.tools)
+        self._tools_loaded_at = time.monotonic()
+
+        logger.info("Loaded %d tools from the MCP Server", len(self.tools))
+
+    async def close(self):
+        """Stop the background tasks and close the checkpointer database."""
+        for task in (self._refresh_task, self._compaction_task):
+            if task is not None:
+                task.cancel()
+
+        if isinstance(self.checkpointer, BoundedSqliteSaver):
+            await self.checkpointer.conn.close()
+        self.checkpointer = None
+        self.graph = None
+
+    def _create_model(self):
+        """Create the chat model."""
         # Set up the Azure OpenAI model via AI Gateway
-        self.model = ChatOpenAI(
+        return ChatOpenAI(
             api_key=self.azure_openai_api_key,
             base_url=self.azure_openai_endpoint,
-            model="gpt-3.5-turbo",  # Specify the model explicitly
+            model=MODEL_NAME,  # Specify the model explicitly
             temperature=0.2,
             max_completion_tokens=1000,
             top_p=0.5,
             default_headers={"Authorization": f"Bearer {self.azure_openai_api_key}"},
+            cache=self.llm_cache,
+            callbacks=[LLMMetricsCallback(MODEL_NAME)],
         )
 
-        # Init auth
-        auth = IdentityServiceAuth()
+    def _create_graph(self, tools):
+        """Create the ReAct graph producing the ResponseFormat of a turn with the configured mode."""
+        if self.structured_response_mode == "legacy":
+            return create_react_agent(
+                self.model,
+                tools=tools,
+                checkpointer=self.checkpointer,
+                prompt=self.SYSTEM_INSTRUCTION,
+                pre_model_hook=self.history_policy,
+                response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
+                version="v2",
+            )
+
+        if self.structured_response_mode == "tool":
+            # The respond tool ends the graph, the model must call a tool on every turn
+            respond_tool = StructuredTool.from_function(
+                respond,
+                name=RESPOND_TOOL_NAME,
+                args_schema=ResponseFormat,
+                return_direct=True,
+            )
+            tools = [*tools, respond_tool]
+            model = self.model.bind_tools(tools, tool_choice="required")
+            prompt = self.SYSTEM_INSTRUCTION + self.RESPOND_INSTRUCTION + self.FORMAT_INSTRUCTION
+        else:
+            # The final answer without tool calls is constrained to the ResponseFormat schema
+            model = self.model.bind_tools(
+                tools,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": ResponseFormat.__name__,
+                        "schema": ResponseFormat.model_json_schema(),
+                    },
+                },
+            )
+            prompt = self.SYSTEM_INSTRUCTION + self.NATIVE_INSTRUCTION + self.FORMAT_INSTRUCTION
+
+        return create_react_agent(
+            model,
+            tools=tools,
+            checkpointer=self.checkpointer,
+            prompt=prompt,
+            pre_model_hook=self.history_policy,
+            version="v2",
+        )
+
+    async def _load_tools(self):
+        """Load the tools from the MCP Server."""
+        # Init auth, tokens are shared through the process-wide token cache
+        auth = CachedIdentityServiceAuth()
 
         # Load tools from the MCP Server
         client = MultiServerMCPClient(
@@ -86,40 +289,56 @@ class CurrencyAgent:
                 },
             }
         )
-        tools = await client.get_tools()
 
-        self.graph = create_react_agent(
-            self.model,
-            tools=tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
-            response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
-        )
+        return self.tool_limiter.wrap(await client.get_tools(), "currency_exchange_mcp")
 
     async def invoke(self, query, session_id) -> AsyncIterable[Dict[str, Any]]:
         """Invoke the agent with a query and session ID."""
         config = {"configurable": {"thread_id": session_id}}
         if not self.graph:
-            raise ValueError("Agent not initialized. Call init_model_and_tools first.")
+            raise ValueError("Agent not initialized. Call ensure_initialized first.")
+
+        response = await self.answer_fast(query, config)
+        if response is not None:
+            return response
 
-        await self.graph.ainvoke({"messages": [("user", query)]}, config)
+        state = await self.graph.ainvoke({"messages": [("user", query)]}, config)
 
-        return self.get_agent_response(config)
+        # Only the messages of this turn, the thread holds the whole conversation
+        messages = state["messages"]
+        last_user_message = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        for message in messages[last_user_message:]:
+            if isinstance(message, AIMessage) and not self._is_respond_message(message):
+                self.tool_limiter.record_fan_out(len(message.tool_calls))
+
+        return await self.get_agent_response(config)
 
     async def stream(self, query, session_id) -> AsyncIterable[Dict[str, Any]]:
         """Stream the agent's response to a query."""
         inputs = {"messages": [("user", query)]}
         config = {"configurable": {"thread_id": session_id}}
         if not self.graph:
-            raise ValueError("Agent not initialized. Call init_model_and_tools first.")
+            raise ValueError("Agent not initialized. Call ensure_initialized first.")
+
+        response = await self.answer_fast(query, config)
+        if response is not None:
+            yield response
+            return
 
         async for item in self.graph.astream(inputs, config, stream_mode="values"):
             message = item["messages"][-1]
+            if self._is_respond_message(message):
+                # The final response is yielded from the state below
+                continue
             if (
                 isinstance(message, AIMessage)
                 and message.tool_calls
                 and len(message.tool_calls) > 0
             ):
+                self.tool_limiter.record_fan_out(len(message.tool_calls))
                 yield {
                     "is_task_complete": False,
                     "require_user_input": False,
@@ -132,12 +351,141 @@ class CurrencyAgent:
                     "content": f"Success. Details: {message.content}",
                 }
 
-        yield self.get_agent_response(config)
+        yield await self.get_agent_response(config)
+
+    async def close_interrupted_turn(self, session_id):
+        """Answer the pending tool calls of a canceled or timed out turn.
+
+        An AI message with unanswered tool calls would be rejected by the LLM
+        on the next turn of the thread.
+        """
+        if not self.graph:
+            return
+
+        config = {"configurable": {"thread_id": session_id}}
+        # pylint: disable=broad-exception-caught
+        try:
+            state = await self.graph.aget_state(config)
+            messages = state.values.get("messages", [])
+            last_ai_message = max(
+                (i for i, m in enumerate(messages) if isinstance(m, AIMessage)),
+                default=None,
+            )
+            if last_ai_message is None:
+                return
+
+            answered = {
+                m.tool_call_id
+                for m in messages[last_ai_message:]
+                if isinstance(m, ToolMessage)
+            }
+            pending = [
+                call
+                for call in messages[last_ai_message].tool_calls
+                if call["id"] not in answered
+            ]
+            if not pending:
+                return
+
+            await self.graph.aupdate_state(
+                config,
+                {
+                    "messages": [
+                        ToolMessage(
+                            content="Canceled.",
+                            name=call["name"],
+                            tool_call_id=call["id"],
+                            status="error",
+                        )
+                        for call in pending
+                    ]
+                },
+                as_node="tools",
+            )
+        except Exception as e:
+            logger.error("Failed to close the interrupted turn of %s: %s", session_id, e)
+
+    async def answer_fast(self, query, config) -> Dict[str, Any] | None:
+        """Answer a simple rate query with the fast path, or return None to use the LLM."""
+        if self.fast_path is None:
+            return None
+
+        answer = await self.fast_path.route(query, self.tools)
+        if answer is None:
+            return None
+
+        structured_response = ResponseFormat(**answer)
+
+        # Record the turn in the thread, so follow-up questions have its context
+        update = {
+            "messages": [
+                HumanMessage(content=query),
+                AIMessage(content=structured_response.message),
+            ],
+        }
+        if self.structured_response_mode == "legacy":
+            update["structured_response"] = structured_response
+            await self.graph.aupdate_state(
+                config, update, as_node="generate_structured_response"
+            )
+        else:
+            # An answer without tool calls ends the graph after the agent node
+            await self.graph.aupdate_state(config, update, as_node="agent")
+
+        return self.format_response(structured_response)
 
-    def get_agent_response(self, config):
+    async def get_agent_response(self, config):
         """Get the agent's response based on the current state."""
-        current_state = self.graph.get_state(config)
-        structured_response = current_state.values.get("structured_response")
+        current_state = await self.graph.aget_state(config)
+
+        if self.structured_response_mode == "legacy":
+            return self.format_response(current_state.values.get("structured_response"))
+
+        return self.format_response(
+            self.parse_final_message(current_state.values.get("messages", []))
+        )
+
+    def _is_respond_message(self, message) -> bool:
+        """Return whether the message is a call to or the result of the respond tool."""
+        if self.structured_response_mode != "tool":
+            return False
+        if isinstance(message, ToolMessage):
+            return message.name == RESPOND_TOOL_NAME
+        return isinstance(message, AIMessage) and any(
+            call["name"] == RESPOND_TOOL_NAME for call in message.tool_calls
+        )
+
+    def parse_final_message(self, messages) -> ResponseFormat | None:
+        """Parse the ResponseFormat from the last message of the turn."""
+        if not messages:
+            return None
+
+        message = messages[-1]
+        if self.structured_response_mode == "tool" and isinstance(message, ToolMessage):
+            # The respond result may not be the last of the tool batch ending the turn
+            for message in reversed(messages):
+                if not isinstance(message, ToolMessage):
+                    return None
+                if message.name == RESPOND_TOOL_NAME:
+                    try:
+                        return ResponseFormat.model_validate_json(str(message.content))
+                    except ValueError:
+                        return None
+            return None
+
+        if not isinstance(message, AIMessage) or message.tool_calls:
+            return None
+
+        try:
+            return ResponseFormat.model_validate_json(str(message.content))
+        except ValueError:
+            # A plain text answer, e.g. a model ignoring the respond tool or the schema
+            if message.content:
+                return ResponseFormat(status="input_required", message=str(message.content))
+            return None
+
+    def format_response(self, structured_response) -> Dict[str, Any]:
+        """Format a structured response for the agent executor."""
         if structured_response and isinstance(structured_response, ResponseFormat):
             logger.info("Structured response: %s", structured_response)
 
@@ -2,29 +2,56 @@
 # SPDX-License-Identifier: Apache-2.0
 """A2A Agent Executor Example."""
 
+import asyncio
 import logging
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (InternalError, InvalidParamsError, Part, Task,
-                       TaskState, TextPart, UnsupportedOperationError)
+                       TaskNotFoundError, TaskState, TextPart)
 from a2a.utils import new_agent_text_message, new_task
 from a2a.utils.errors import ServerError
+from opentelemetry import trace
 
 from agent import CurrencyAgent
+from metrics import A2A_TASK_TRANSITIONS, A2A_TASKS_IN_FLIGHT
+from task_store import SqliteTaskStore
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# Message metadata key with the seconds left in the caller's budget
+TIMEOUT_METADATA_KEY = "timeout"
 
 
 class CurrencyAgentExecutor(AgentExecutor):
     """Currency Conversion AgentExecutor Example."""
 
-    def __init__(self, azure_openai_endpoint, azure_openai_api_key, currency_exchange_mcp_server_url):
+    def __init__(
+        self,
+        azure_openai_endpoint,
+        azure_openai_api_key,
+        currency_exchange_mcp_server_url,
+        task_timeout: float = 120.0,
+        cancel_timeout: float = 5.0,
+        task_store: SqliteTaskStore | None = None,
+        cancel_poll_interval: float = 1.0,
+        **agent_options,
+    ):
+        self.task_timeout = task_timeout
+        self.cancel_timeout = cancel_timeout
+        self.task_store = task_store
+        self.cancel_poll_interval = cancel_poll_interval
+
+        # Running executions by task id, so tasks/cancel can stop them
+        self._running: dict[str, asyncio.Task] = {}
+
         self.agent = CurrencyAgent(
             azure_openai_endpoint=azure_openai_endpoint,
             azure_openai_api_key=azure_openai_api_key,
             currency_exchange_mcp_server_url=currency_exchange_mcp_server_url,
+            **agent_options,
         )
 
     async def execute(
@@ -36,56 +63,159 @@ class CurrencyAgentExecutor(AgentExecutor):
         if error:
             raise ServerError(error=InvalidParamsError())
 
-        # Initialize the agent and tools
-        await self.agent.init_model_and_tools()
+        # Initialize the agent and tools once, they are reused across requests
+        await self.agent.ensure_initialized()
 
         query = context.get_user_input()
         task = context.current_task
         if not task:
             task = new_task(context.message)
+            A2A_TASK_TRANSITIONS.labels(TaskState.submitted.value).inc()
             await event_queue.enqueue_event(task)
         updater = TaskUpdater(event_queue, task.id, task.contextId)
-        try:
-            async for item in self.agent.stream(query, task.contextId):
-                is_task_complete = item["is_task_complete"]
-                require_user_input = item["require_user_input"]
-
-                if not is_task_complete and not require_user_input:
-                    await updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            item["content"],
-                            task.contextId,
-                            task.id,
-                        ),
-                    )
-                elif require_user_input:
-                    await updater.update_status(
-                        TaskState.input_required,
-                        new_agent_text_message(
-                            item["content"],
-                            task.contextId,
-                            task.id,
-                        ),
-                        final=True,
-                    )
-                    break
-                else:
-                    await updater.add_artifact(
-                        [Part(root=TextPart(text=item["content"]))],
-                        name="conversion_result",
+        timeout = self._get_timeout(context)
+        self._running[task.id] = asyncio.current_task()
+        watcher = self._watch_cancel(task.id)
+        with A2A_TASKS_IN_FLIGHT.track_inprogress(), tracer.start_as_current_span(
+            "execute_task currency_agent",
+            attributes={
+                "a2a.task_id": task.id,
+                "a2a.context_id": task.contextId,
+                "a2a.timeout": timeout,
+            },
+        ) as span:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._stream(query, task, updater)
+
+            except asyncio.CancelledError:
+                logger.info("Task %s was canceled", task.id)
+                span.set_attribute("a2a.canceled", True)
+                await self.agent.close_interrupted_turn(task.contextId)
+                if watcher is None or not watcher.done() or not watcher.result():
+                    raise
+
+                # Canceled through another worker, end the stream of this one
+                # with the canceled status instead of an error
+                asyncio.current_task().uncancel()
+                await updater.cancel()
+
+            except TimeoutError:
+                logger.warning("Task %s timed out after %.1f seconds", task.id, timeout)
+                span.set_attribute("a2a.timed_out", True)
+                await self.agent.close_interrupted_turn(task.contextId)
+                A2A_TASK_TRANSITIONS.labels(TaskState.failed.value).inc()
+                await updater.failed(
+                    new_agent_text_message(
+                        "The request timed out. Please try again.",
+                        task.contextId,
+                        task.id,
                     )
-                    await updater.complete()
-                    break
+                )
+
+            except Exception as e:
+                logger.error("An error occurred while streaming the response: %e", e)
+                raise ServerError(error=InternalError()) from e
+
+            finally:
+                self._running.pop(task.id, None)
+                if watcher is not None:
+                    watcher.cancel()
+
+    def _watch_cancel(self, task_id: str) -> asyncio.Task | None:
+        """Stop the current execution once another worker cancels its task.
+
+        tasks/cancel may reach any worker sharing the task store, only the
+        worker running the task can stop it. Returns the watching task, which
+        results in True if it stopped the execution, or None without a shared
+        task store.
+        """
+        if self.task_store is None or self.cancel_poll_interval <= 0:
+            return None
 
-        except Exception as e:
-            logger.error("An error occurred while streaming the response: %e", e)
-            raise ServerError(error=InternalError()) from e
+        running = asyncio.current_task()
+
+        async def watch() -> bool:
+            # pylint: disable=broad-exception-caught
+            while True:
+                await asyncio.sleep(self.cancel_poll_interval)
+                try:
+                    canceled = await self.task_store.is_canceled(task_id)
+                except Exception as e:
+                    logger.warning("Failed to check whether task %s was canceled: %s", task_id, e)
+                    continue
+                if canceled:
+                    logger.info("Task %s was canceled by another worker", task_id)
+                    running.cancel()
+                    return True
+
+        return asyncio.create_task(watch())
+
+    async def _stream(self, query, task: Task, updater: TaskUpdater) -> None:
+        """Stream the agent's response into task updates."""
+        async for item in self.agent.stream(query, task.contextId):
+            is_task_complete = item["is_task_complete"]
+            require_user_input = item["require_user_input"]
+
+            if not is_task_complete and not require_user_input:
+                A2A_TASK_TRANSITIONS.labels(TaskState.working.value).inc()
+                await updater.update_status(
+                    TaskState.working,
+                    new_agent_text_message(
+                        item["content"],
+                        task.contextId,
+                        task.id,
+                    ),
+                )
+            elif require_user_input:
+                A2A_TASK_TRANSITIONS.labels(TaskState.input_required.value).inc()
+                await updater.update_status(
+                    TaskState.input_required,
+                    new_agent_text_message(
+                        item["content"],
+                        task.contextId,
+                        task.id,
+                    ),
+                    final=True,
+                )
+                break
+            else:
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=item["content"]))],
+                    name="conversion_result",
+                )
+                A2A_TASK_TRANSITIONS.labels(TaskState.completed.value).inc()
+                await updater.complete()
+                break
 
     def _validate_request(self, _: RequestContext) -> bool:
         """Validates the request parameters."""
         return False
 
-    async def cancel(self, _: RequestContext, _2: EventQueue) -> Task | None:
-        """Cancels the current task."""
-        raise ServerError(error=UnsupportedOperationError())
+    def _get_timeout(self, context: RequestContext) -> float:
+        """Return the seconds the task may run, bounded by the caller's remaining budget."""
+        metadata = (context.message.metadata if context.message else None) or {}
+        try:
+            budget = float(metadata[TIMEOUT_METADATA_KEY])
+        except (KeyError, TypeError, ValueError):
+            return self.task_timeout
+
+        return max(0.0, min(budget, self.task_timeout))
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> Task | None:
+        """Cancels the current task, stopping its in-flight LLM and tool calls."""
+        task = context.current_task
+        if not task:
+            raise ServerError(error=TaskNotFoundError())
+
+        # Stop the execution first, so no update follows the canceled status
+        running = self._running.pop(task.id, None)
+        if running is not None and not running.done():
+            running.cancel()
+            await asyncio.wait([running], timeout=self.cancel_timeout)
+
+        updater = TaskUpdater(event_queue, task.id, task.contextId)
+        A2A_TASK_TRANSITIONS.labels(TaskState.canceled.value).inc()
+        await updater.cancel()
+
+        return None
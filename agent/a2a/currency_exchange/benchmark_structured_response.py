@@ -0,0 +1,162 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark of the LLM round trips spent producing the ResponseFormat of a turn.
+
+Compares the legacy mode, which runs an extra structured-output LLM call after
+the ReAct loop, with the tool and native modes, which produce the structured
+status in the final answer step. The LLM is replaced by a scripted fake with a
+configurable latency and the MCP tool by a local stub, so the benchmark runs
+offline.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any
+from uuid import uuid4
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent import (RESPOND_TOOL_NAME, STRUCTURED_RESPONSE_MODES, CurrencyAgent,
+                   ResponseFormat)
+
+ANSWER = {"status": "completed", "message": "1020 CAD is 693.60 EUR."}
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted chat model: look up the rate, then answer in the bound format."""
+
+    latency: float = 0.1
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        """Bind the tools like ChatOpenAI, so the graph sees the same bound kwargs."""
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools],
+            tool_choice=tool_choice,
+            **kwargs,
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, **kwargs))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, **kwargs))])
+
+    def _reply(self, messages, tools=None, response_format=None, **_) -> AIMessage:
+        """Return the next message of the script for the conversation."""
+        tool_names = [tool["function"]["name"] for tool in tools or []]
+
+        # Structured-output call of the legacy mode
+        if tool_names == [ResponseFormat.__name__]:
+            return self._tool_call(ResponseFormat.__name__, ANSWER)
+
+        if not isinstance(messages[-1], ToolMessage):
+            return self._tool_call(
+                "get_currency_exchange_rate",
+                {"currency_from": "CAD", "currency_to": "EUR"},
+            )
+        if RESPOND_TOOL_NAME in tool_names:
+            return self._tool_call(RESPOND_TOOL_NAME, ANSWER)
+        if response_format is not None:
+            return AIMessage(content=json.dumps(ANSWER))
+
+        return AIMessage(content=ANSWER["message"])
+
+    @staticmethod
+    def _tool_call(name: str, args: dict[str, Any]) -> AIMessage:
+        return AIMessage(
+            content="",
+            tool_calls=[{"id": uuid4().hex, "name": name, "args": args}],
+        )
+
+
+async def get_currency_exchange_rate(currency_from: str, currency_to: str) -> str:
+    """Get the exchange rate between two currencies."""
+    return json.dumps(
+        {"amount": 1.0, "base": currency_from, "date": "2025-01-01", "rates": {currency_to: 0.68}}
+    )
+
+
+class BenchmarkCurrencyAgent(CurrencyAgent):
+    """CurrencyAgent running on the fake LLM and the stub MCP tool."""
+
+    def __init__(self, model: FakeChatModel, **kwargs) -> None:
+        super().__init__(
+            azure_openai_endpoint="",
+            azure_openai_api_key="",
+            currency_exchange_mcp_server_url="",
+            tools_refresh_interval=0,
+            fast_path_enabled=False,
+            llm_cache_max_size=0,
+            **kwargs,
+        )
+        self.fake_model = model
+
+    def _create_model(self):
+        return self.fake_model
+
+    async def _load_tools(self):
+        return [StructuredTool.from_function(coroutine=get_currency_exchange_rate)]
+
+
+async def run(mode: str, latency: float, turns: int) -> tuple[list[float], float]:
+    """Run turns of one mode and return the turn latencies and the LLM calls per turn."""
+    model = FakeChatModel(latency=latency)
+    agent = BenchmarkCurrencyAgent(model, structured_response_mode=mode)
+    await agent.ensure_initialized()
+
+    timings = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        response = await agent.invoke("How much is 1020 CAD in EUR?", uuid4().hex)
+        timings.append(time.perf_counter() - start)
+        assert response["is_task_complete"], response
+
+    await agent.close()
+
+    return timings, model.calls / turns
+
+
+def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake LLM call.")
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    baseline = None
+    for mode in ("legacy", *(m for m in STRUCTURED_RESPONSE_MODES if m != "legacy")):
+        timings, calls = asyncio.run(run(mode, args.latency, args.turns))
+        mean = statistics.mean(timings)
+        line = (
+            f"{mode:<8} "
+            f"{calls:4.1f} LLM calls/turn  "
+            f"mean {mean * 1000:8.1f} ms  "
+            f"max {max(timings) * 1000:8.1f} ms"
+        )
+        if baseline:
+            line += f"  {baseline / mean:5.2f}x faster"
+        else:
+            baseline = mean
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Checkpointer backends for the agent graph."""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (BaseCheckpointSaver, ChannelVersions,
+                                       Checkpoint, CheckpointMetadata)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedSqliteSaver(AsyncSqliteSaver):
+    """SQLite (WAL) checkpointer keeping a bounded number of checkpoints per thread.
+
+    Only the newest ``max_checkpoints_per_thread`` checkpoints of a thread are
+    kept, the latest one holding the whole conversation state, and threads idle
+    for longer than ``thread_ttl`` seconds are evicted by ``compact``. The
+    database can be shared by several worker processes.
+    """
+
+    def __init__(
+        self,
+        conn: aiosqlite.Connection,
+        max_checkpoints_per_thread: int = 10,
+        thread_ttl: float = 86400.0,
+    ):
+        super().__init__(conn)
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.thread_ttl = thread_ttl
+
+    async def setup(self) -> None:
+        """Set up the checkpoint database and the thread activity table."""
+        if self.is_setup:
+            return
+
+        await super().setup()
+
+        async with self.lock:
+            await self.conn.executescript(
+                """
+                PRAGMA busy_timeout=5000;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+                """
+            )
+            await self.conn.commit()
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint and drop the oldest checkpoints of its thread."""
+        next_config = await super().aput(config, checkpoint, metadata, new_versions)
+
+        thread_id = str(next_config["configurable"]["thread_id"])
+        checkpoint_ns = next_config["configurable"]["checkpoint_ns"]
+
+        # Checkpoint IDs are time ordered (UUIDv6), keep the newest ones
+        async with self.lock:
+            await self.conn.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, updated_at) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            for table in ("checkpoints", "writes"):
+                await self.conn.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < (
+                        SELECT MIN(checkpoint_id) FROM (
+                            SELECT checkpoint_id FROM checkpoints
+                            WHERE thread_id = ? AND checkpoint_ns = ?
+                            ORDER BY checkpoint_id DESC LIMIT ?
+                        )
+                    )
+                    """,
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        thread_id,
+                        checkpoint_ns,
+                        self.max_checkpoints_per_thread,
+                    ),
+                )
+            await self.conn.commit()
+
+        return next_config
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints, writes and activity of a thread."""
+        await super().adelete_thread(thread_id)
+
+        async with self.lock:
+            await self.conn.execute(
+                "DELETE FROM threads WHERE thread_id = ?", (str(thread_id),)
+            )
+            await self.conn.commit()
+
+    async def compact(self) -> int:
+        """Evict idle threads and return the WAL to the database file.
+
+        Returns:
+            The number of evicted threads.
+        """
+        await self.setup()
+
+        async with self.lock:
+            cursor = await self.conn.execute(
+                "SELECT thread_id FROM threads WHERE updated_at < ?",
+                (time.time() - self.thread_ttl,),
+            )
+            thread_ids = [row[0] for row in await cursor.fetchall()]
+
+        for thread_id in thread_ids:
+            await self.adelete_thread(thread_id)
+
+        async with self.lock:
+            await self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        if thread_ids:
+            logger.info("Evicted %d idle threads", len(thread_ids))
+
+        return len(thread_ids)
+
+    async def run_compaction(self, interval: float) -> None:
+        """Compact the database every interval seconds until cancelled."""
+        # pylint: disable=broad-exception-caught
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.error("Failed to compact checkpoints: %s", e)
+
+
+async def create_checkpointer(
+    url: str,
+    max_checkpoints_per_thread: int = 10,
+    thread_ttl: float = 86400.0,
+) -> BaseCheckpointSaver:
+    """Create the checkpointer for a backend URL.
+
+    Args:
+        url: "memory" for an unbounded in-process saver, or "sqlite:///<path>" for a bounded SQLite saver.
+        max_checkpoints_per_thread: The number of checkpoints kept per thread by the SQLite saver.
+        thread_ttl: The seconds after which idle threads are evicted by the SQLite saver.
+    """
+    if url == "memory":
+        return MemorySaver()
+
+    if url.startswith("sqlite:///"):
+        path = Path(url.removeprefix("sqlite:///"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = await aiosqlite.connect(path)
+        checkpointer = BoundedSqliteSaver(
+            conn,
+            max_checkpoints_per_thread=max_checkpoints_per_thread,
+            thread_ttl=thread_ttl,
+        )
+        await checkpointer.setup()
+
+        return checkpointer
+
+    raise ValueError(f"Unsupported checkpointer URL: {url}")
@@ -0,0 +1,203 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Deterministic router answering simple rate queries without the LLM."""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# Currencies published by the exchange rate API, others are left to the LLM
+CURRENCIES = frozenset(
+    (
+        "AUD BGN BRL CAD CHF CNY CZK DKK EUR GBP HKD HUF IDR ILS INR ISK JPY KRW "
+        "MXN MYR NOK NZD PHP PLN RON SEK SGD THB TRY USD ZAR"
+    ).split()
+)
+
+_CODE = r"([A-Za-z]{3})"
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?)"
+_DATE = r"(?:\s+(?:on|for|as of)\s+(\d{4}-\d{2}-\d{2}))?"
+_END = r"\s*[?.!]?\s*$"
+
+# (pattern, group index of the amount or None, from, to, date)
+_PATTERNS = [
+    (
+        re.compile(
+            r"^\s*(?:what\s+is|what's|get|show(?:\s+me)?)?\s*(?:the\s+)?(?:current\s+)?"
+            rf"(?:exchange\s+)?rate\s+(?:between|from|of)\s+{_CODE}\s+(?:and|to|in)\s+{_CODE}"
+            rf"{_DATE}{_END}",
+            re.IGNORECASE,
+        ),
+        None, 1, 2, 3,
+    ),
+    (
+        re.compile(
+            rf"^\s*how\s+much\s+is\s+{_AMOUNT}\s*{_CODE}\s+(?:in|to|into)\s+{_CODE}{_DATE}{_END}",
+            re.IGNORECASE,
+        ),
+        1, 2, 3, 4,
+    ),
+    (
+        re.compile(
+            rf"^\s*(?:convert\s+)?{_AMOUNT}\s*{_CODE}\s+(?:in|to|into)\s+{_CODE}{_DATE}{_END}",
+            re.IGNORECASE,
+        ),
+        1, 2, 3, 4,
+    ),
+    (
+        re.compile(rf"^\s*{_CODE}\s*(?:/|to)\s*{_CODE}{_DATE}{_END}", re.IGNORECASE),
+        None, 1, 2, 3,
+    ),
+]
+
+
+@dataclass(frozen=True)
+class RateQuery:
+    """A simple rate or conversion query."""
+
+    currency_from: str
+    currency_to: str
+    amount: float | None = None
+    currency_date: str = "latest"
+
+
+def parse_rate_query(query: str) -> RateQuery | None:
+    """Parse a simple rate or conversion query, or return None if it is not one."""
+    for pattern, amount_group, from_group, to_group, date_group in _PATTERNS:
+        match = pattern.match(query)
+        if match is None:
+            continue
+
+        currency_from = match.group(from_group).upper()
+        currency_to = match.group(to_group).upper()
+        if currency_from not in CURRENCIES or currency_to not in CURRENCIES:
+            return None
+
+        currency_date = match.group(date_group) or "latest"
+        if currency_date != "latest":
+            try:
+                date.fromisoformat(currency_date)
+            except ValueError:
+                return None
+
+        amount = (
+            float(match.group(amount_group).replace(",", ""))
+            if amount_group is not None
+            else None
+        )
+
+        return RateQuery(currency_from, currency_to, amount, currency_date)
+
+    return None
+
+
+def tool_text(content: Any) -> str:
+    """Return the text of a tool result, a string or a list of content blocks.
+
+    MCP tools return a list of content blocks, dicts such as
+    {"type": "text", "text": "..."} with recent adapters, strings with older ones.
+    """
+    if not isinstance(content, list):
+        return str(content)
+
+    parts = []
+    for part in content:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict):
+            parts.append(part.get("text", ""))
+        else:
+            parts.append(getattr(part, "text", ""))
+
+    return "".join(parts)
+
+
+class FastPathRouter:
+    """Answers simple rate queries by calling the MCP tool directly.
+
+    Queries the router cannot parse, or whose tool result it cannot read, are
+    left to the LLM.
+    """
+
+    TOOL_NAME = "get_currency_exchange_rate"
+
+    def __init__(self) -> None:
+        """Initialize the router."""
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def route(self, query: str, tools: list[BaseTool]) -> dict[str, str] | None:
+        """Answer the query with the rate tool.
+
+        Returns:
+            The status and message of the response, or None to fall back to the LLM.
+        """
+        rate_query = parse_rate_query(query)
+        tool = next((t for t in tools if t.name == self.TOOL_NAME), None)
+        if rate_query is None or tool is None:
+            self.misses += 1
+            return None
+
+        # pylint: disable=broad-exception-caught
+        try:
+            content = await tool.ainvoke(
+                {
+                    "currency_from": rate_query.currency_from,
+                    "currency_to": rate_query.currency_to,
+                    "currency_date": rate_query.currency_date,
+                }
+            )
+            result = json.loads(tool_text(content))
+            if not isinstance(result, dict):
+                raise ValueError(f"expected a JSON object, got {type(result).__name__}")
+        except Exception as e:
+            logger.warning("Fast path failed, falling back to the LLM: %s", e)
+            self.misses += 1
+            return None
+
+        if "error" in result:
+            self.errors += 1
+            return {"status": "error", "message": result["error"]}
+
+        rate = result.get("rates", {}).get(rate_query.currency_to)
+        if rate is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {"status": "completed", "message": self.render(rate_query, rate, result.get("date"))}
+
+    @staticmethod
+    def render(rate_query: RateQuery, rate: float, rate_date: str | None) -> str:
+        """Render the answer to a rate or conversion query."""
+        as_of = f" as of {rate_date}" if rate_date else ""
+        if rate_query.amount is None:
+            return (
+                f"The exchange rate from {rate_query.currency_from} to "
+                f"{rate_query.currency_to} is {rate:.4f}{as_of}."
+            )
+
+        return (
+            f"{rate_query.amount:,.2f} {rate_query.currency_from} is "
+            f"{rate_query.amount * rate:,.2f} {rate_query.currency_to} "
+            f"at an exchange rate of {rate:.4f}{as_of}."
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return the router counters."""
+        total = self.hits + self.misses + self.errors
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": (self.hits + self.errors) / total if total else 0.0,
+        }
@@ -0,0 +1,110 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Conversation history policy bounding the messages sent to the LLM."""
+
+import logging
+from typing import Any
+
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages.utils import (count_tokens_approximately,
+                                           trim_messages)
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryPolicy:
+    """Pre-model hook trimming the persisted conversation before every LLM call.
+
+    The checkpointed thread keeps the whole conversation, only the LLM input
+    is bounded: tool results of previous turns are folded into short
+    summaries, then the most recent messages are kept within both a message
+    count and an approximate token budget, always starting on a user message.
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 20,
+        max_tokens: int = 2000,
+        tool_message_max_chars: int = 200,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_messages: The maximum number of messages sent to the LLM.
+            max_tokens: The approximate token budget of the messages sent to the LLM.
+            tool_message_max_chars: The length tool results of previous turns are folded to.
+        """
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.tool_message_max_chars = tool_message_max_chars
+
+        self.calls = 0
+        self.prompt_tokens_total = 0
+        self.prompt_tokens_last = 0
+        self.prompt_tokens_max = 0
+        self.trimmed_messages_total = 0
+
+    def _fold(self, message: ToolMessage) -> ToolMessage:
+        """Return the tool message with its content folded into a short summary."""
+        content = str(message.content)
+        if len(content) <= self.tool_message_max_chars:
+            return message
+
+        return message.model_copy(
+            update={
+                "content": f"{content[: self.tool_message_max_chars]}... "
+                f"[{len(content) - self.tool_message_max_chars} characters omitted]"
+            }
+        )
+
+    def __call__(self, state: dict[str, Any]) -> dict[str, Any]:
+        """Return the messages to send to the LLM for the current state."""
+        messages = state["messages"]
+
+        # Tool results are only needed in full for the current turn
+        last_user_message = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        folded = [
+            self._fold(m) if isinstance(m, ToolMessage) and i < last_user_message else m
+            for i, m in enumerate(messages)
+        ]
+
+        trimmed = trim_messages(
+            folded[-self.max_messages :],
+            strategy="last",
+            token_counter=count_tokens_approximately,
+            max_tokens=self.max_tokens,
+            start_on="human",
+            allow_partial=False,
+        )
+        # Never send an empty prompt, even if the current turn exceeds the budget
+        if not trimmed:
+            trimmed = folded[last_user_message:]
+
+        prompt_tokens = count_tokens_approximately(trimmed)
+        self.calls += 1
+        self.prompt_tokens_total += prompt_tokens
+        self.prompt_tokens_last = prompt_tokens
+        self.prompt_tokens_max = max(self.prompt_tokens_max, prompt_tokens)
+        self.trimmed_messages_total += len(messages) - len(trimmed)
+
+        logger.debug(
+            "Sending %d of %d messages to the LLM (~%d tokens)",
+            len(trimmed),
+            len(messages),
+            prompt_tokens,
+        )
+
+        return {"llm_input_messages": trimmed}
+
+    def stats(self) -> dict[str, Any]:
+        """Return the prompt size counters."""
+        return {
+            "calls": self.calls,
+            "prompt_tokens_last": self.prompt_tokens_last,
+            "prompt_tokens_max": self.prompt_tokens_max,
+            "prompt_tokens_avg": self.prompt_tokens_total / self.calls if self.calls else 0.0,
+            "trimmed_messages_total": self.trimmed_messages_total,
+        }
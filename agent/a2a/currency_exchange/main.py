@@ -5,19 +5,25 @@
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 
 import click
 import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import (AgentCapabilities, AgentCard, AgentSkill,
                        HTTPAuthSecurityScheme, SecurityScheme)
 from dotenv import load_dotenv
-from identityservice.auth.starlette import IdentityServiceA2AMiddleware
+from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+from starlette.applications import Starlette
 
 from agent import CurrencyAgent
 from agent_executor import CurrencyAgentExecutor
+from metrics import MetricsMiddleware, metrics_endpoint, stats_collector
+from middleware import A2AAuthMiddleware
+from task_store import SqliteTaskStore, create_task_store
+from token_cache import token_cache
+from tracing import setup_tracing, shutdown_tracing
 
 load_dotenv()
 
@@ -25,9 +31,147 @@ logging.basicConfig(level=os.getenv("LOG_LEVEL", "DEBUG").upper())
 logger = logging.getLogger(__name__)
 
 
+def create_app() -> Starlette:
+    """Create the Currency Agent application from the environment.
+
+    Every worker process calls this factory, so the agent, its graph and the
+    task store connection are created per worker.
+    """
+    setup_tracing("currency-agent")
+
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "9091"))
+
+    # Define auth scheme
+    AUTH_SCHEME = "IdentityServiceAuthScheme"
+    auth_scheme = HTTPAuthSecurityScheme(
+        scheme="bearer",
+        bearerFormat="JWT",
+    )
+
+    capabilities = AgentCapabilities(streaming=True, pushNotifications=True)
+    skill = AgentSkill(
+        id="convert_currency",
+        name="Currency Exchange Rates Tool",
+        description="Helps with exchange values between various currencies",
+        tags=["currency conversion", "currency exchange"],
+        examples=["What is exchange rate between USD and GBP?"],
+    )
+    agent_url = os.getenv("AGENT_URL", "")
+    public_url = agent_url if agent_url else f"http://{host}:{port}/"
+    agent_card = AgentCard(
+        name="Currency Agent",
+        description="Helps with exchange rates for currencies",
+        url=public_url,
+        version="1.0.0",
+        defaultInputModes=CurrencyAgent.SUPPORTED_CONTENT_TYPES,
+        defaultOutputModes=CurrencyAgent.SUPPORTED_CONTENT_TYPES,
+        capabilities=capabilities,
+        skills=[skill],
+        securitySchemes={AUTH_SCHEME: SecurityScheme(root=auth_scheme)},
+        security=[
+            {
+                AUTH_SCHEME: ["*"],
+            }
+        ],
+    )
+
+    task_store = create_task_store(
+        os.getenv("TASK_STORE_URL", "sqlite:///data/tasks.db"),
+        task_ttl=float(os.getenv("TASK_TTL", "3600")),
+        stale_task_ttl=float(os.getenv("TASK_STALE_TTL", "86400")),
+        flush_interval=float(os.getenv("TASK_STORE_FLUSH_INTERVAL", "0.05")),
+        cleanup_interval=float(os.getenv("TASK_STORE_CLEANUP_INTERVAL", "300")),
+    )
+
+    # Initialize the agent executor and request handler, the executor watches
+    # the tasks shared with other workers for cancellations
+    agent_executor = CurrencyAgentExecutor(
+        os.getenv("AZURE_OPENAI_ENDPOINT", ""),
+        os.getenv("AZURE_OPENAI_API_KEY", ""),
+        os.getenv("CURRENCY_EXCHANGE_MCP_SERVER_URL", "http://localhost:9090/mcp"),
+        task_timeout=float(os.getenv("TASK_TIMEOUT", "120")),
+        cancel_timeout=float(os.getenv("TASK_CANCEL_TIMEOUT", "5")),
+        task_store=task_store if isinstance(task_store, SqliteTaskStore) else None,
+        cancel_poll_interval=float(os.getenv("TASK_CANCEL_POLL_INTERVAL", "1")),
+        tools_refresh_interval=float(os.getenv("TOOLS_REFRESH_INTERVAL", "300")),
+        checkpointer_url=os.getenv("CHECKPOINTER_URL", "sqlite:///data/checkpoints.db"),
+        max_checkpoints_per_thread=int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10")),
+        thread_ttl=float(os.getenv("CHECKPOINT_THREAD_TTL", "86400")),
+        compaction_interval=float(os.getenv("CHECKPOINT_COMPACTION_INTERVAL", "300")),
+        history_max_messages=int(os.getenv("HISTORY_MAX_MESSAGES", "20")),
+        history_max_tokens=int(os.getenv("HISTORY_MAX_TOKENS", "2000")),
+        history_tool_message_max_chars=int(
+            os.getenv("HISTORY_TOOL_MESSAGE_MAX_CHARS", "200")
+        ),
+        mcp_max_concurrency=int(os.getenv("MCP_MAX_CONCURRENCY", "16")),
+        tool_max_concurrency=int(os.getenv("TOOL_MAX_CONCURRENCY", "8")),
+        fast_path_enabled=os.getenv("FAST_PATH_ENABLED", "true").lower() == "true",
+        llm_cache_max_size=int(os.getenv("LLM_CACHE_MAX_SIZE", "1024")),
+        llm_cache_ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+        llm_cache_rate_ttl=float(os.getenv("LLM_CACHE_RATE_TTL", "120")),
+        llm_cache_rate_max_age=float(os.getenv("LLM_CACHE_RATE_MAX_AGE", "60")),
+        llm_cache_semantic_threshold=float(
+            os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD", "0")
+        ),
+        structured_response_mode=os.getenv("STRUCTURED_RESPONSE_MODE", "tool"),
+    )
+
+    # Cache and limiter counters are read on every /metrics scrape
+    agent = agent_executor.agent
+    stats_collector.register("access_token_cache", token_cache.stats)
+    stats_collector.register("tool_limiter", agent.tool_limiter.stats)
+    stats_collector.register("history", agent.history_policy.stats)
+    if agent.fast_path is not None:
+        stats_collector.register("fast_path", agent.fast_path.stats)
+    if agent.llm_cache is not None:
+        stats_collector.register("llm_cache", agent.llm_cache.stats)
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=agent_executor,
+        task_store=task_store,
+    )
+    server = A2AStarletteApplication(
+        agent_card=agent_card, http_handler=request_handler
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: Starlette):
+        yield
+
+        # In-flight requests are drained by uvicorn before the lifespan ends
+        await agent_executor.agent.close()
+        if isinstance(task_store, SqliteTaskStore):
+            await task_store.close()
+        shutdown_tracing()
+
+    app = server.build(lifespan=lifespan)
+    app.add_route("/metrics", metrics_endpoint)
+
+    # Add IdentityServiceMiddleware for authentication
+    app.add_middleware(
+        A2AAuthMiddleware,
+        agent_card=agent_card,
+        public_paths=["/.well-known/agent.json", "/metrics"],
+        cache_max_size=int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000")),
+        cache_max_ttl=float(os.getenv("AUTH_CACHE_MAX_TTL", "300")),
+        cache_negative_ttl=float(os.getenv("AUTH_CACHE_NEGATIVE_TTL", "5")),
+    )
+
+    app.add_middleware(
+        MetricsMiddleware, routes=["/", "/.well-known/agent.json", "/metrics"]
+    )
+
+    # Outermost, so the server span covers authentication and continues the
+    # trace context sent by the financial assistant
+    app.add_middleware(OpenTelemetryMiddleware, excluded_urls="metrics")
+
+    return app
+
+
 @click.command()
-@click.option("--host", "host", default="0.0.0.0")
-@click.option("--port", "port", default=9091)
+@click.option("--host", "host", default=os.getenv("HOST", "0.0.0.0"))
+@click.option("--port", "port", default=int(os.getenv("PORT", "9091")), type=int)
 @click.option(
     "--azure-openai-endpoint", default=os.getenv("AZURE_OPENAI_ENDPOINT", "")
 )
@@ -37,70 +181,85 @@ logger = logging.getLogger(__name__)
     default=os.getenv("CURRENCY_EXCHANGE_MCP_SERVER_URL", "http://localhost:9090/mcp"),
 )
 @click.option(
-    "--agent-url", 
+    "--agent-url",
     default=os.getenv("AGENT_URL", ""),
 )
-
-def main(host, port, azure_openai_endpoint, azure_openai_api_key, currency_exchange_mcp_server_url, agent_url):
+@click.option(
+    "--tools-refresh-interval",
+    default=float(os.getenv("TOOLS_REFRESH_INTERVAL", "300")),
+    type=float,
+    help="Seconds between MCP tool list refreshes, 0 to disable.",
+)
+@click.option(
+    "--checkpointer-url",
+    default=os.getenv("CHECKPOINTER_URL", "sqlite:///data/checkpoints.db"),
+    help='Conversation checkpointer, "memory" or "sqlite:///<path>".',
+)
+@click.option(
+    "--task-store-url",
+    default=os.getenv("TASK_STORE_URL", "sqlite:///data/tasks.db"),
+    help='A2A task store, "memory" or "sqlite:///<path>" to share tasks between workers.',
+)
+@click.option(
+    "--workers",
+    default=int(os.getenv("WORKERS", "1")),
+    type=int,
+    help="Number of worker processes, requires SQLite checkpointer and task store URLs.",
+)
+@click.option(
+    "--loop",
+    default=os.getenv("UVICORN_LOOP", "auto"),
+    type=click.Choice(["auto", "asyncio", "uvloop"]),
+    help="Event loop, auto selects uvloop when installed.",
+)
+@click.option(
+    "--http",
+    default=os.getenv("UVICORN_HTTP", "auto"),
+    type=click.Choice(["auto", "h11", "httptools"]),
+    help="HTTP protocol implementation, auto selects httptools when installed.",
+)
+@click.option(
+    "--graceful-shutdown-timeout",
+    default=float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30")),
+    type=float,
+    help="Seconds in-flight requests are drained for on shutdown.",
+)
+def main(host, port, azure_openai_endpoint, azure_openai_api_key, currency_exchange_mcp_server_url, agent_url, tools_refresh_interval, checkpointer_url, task_store_url, workers, loop, http, graceful_shutdown_timeout):
     """Starts the Currency Agent server."""
 
-    # Define auth scheme
-    AUTH_SCHEME = "IdentityServiceAuthScheme"
-    auth_scheme = HTTPAuthSecurityScheme(
-        scheme="bearer",
-        bearerFormat="JWT",
+    # Worker processes build the app with create_app from the environment
+    os.environ.update(
+        {
+            "HOST": host,
+            "PORT": str(port),
+            "AZURE_OPENAI_ENDPOINT": azure_openai_endpoint,
+            "AZURE_OPENAI_API_KEY": azure_openai_api_key,
+            "CURRENCY_EXCHANGE_MCP_SERVER_URL": currency_exchange_mcp_server_url,
+            "AGENT_URL": agent_url,
+            "TOOLS_REFRESH_INTERVAL": str(tools_refresh_interval),
+            "CHECKPOINTER_URL": checkpointer_url,
+            "TASK_STORE_URL": task_store_url,
+        }
     )
 
-    # pylint: disable=broad-exception-caught
-    try:
-        capabilities = AgentCapabilities(streaming=True, pushNotifications=True)
-        skill = AgentSkill(
-            id="convert_currency",
-            name="Currency Exchange Rates Tool",
-            description="Helps with exchange values between various currencies",
-            tags=["currency conversion", "currency exchange"],
-            examples=["What is exchange rate between USD and GBP?"],
-        )
-        public_url = agent_url if agent_url else f"http://{host}:{port}/"
-        agent_card = AgentCard(
-            name="Currency Agent",
-            description="Helps with exchange rates for currencies",
-            url=public_url,
-            version="1.0.0",
-            defaultInputModes=CurrencyAgent.SUPPORTED_CONTENT_TYPES,
-            defaultOutputModes=CurrencyAgent.SUPPORTED_CONTENT_TYPES,
-            capabilities=capabilities,
-            skills=[skill],
-            securitySchemes={AUTH_SCHEME: SecurityScheme(root=auth_scheme)},
-            security=[
-                {
-                    AUTH_SCHEME: ["*"],
-                }
-            ],
+    if workers > 1 and "memory" in (checkpointer_url, task_store_url):
+        logger.warning(
+            "In-memory checkpointer or task store is not shared between %d workers",
+            workers,
         )
 
-        # Initialize the HTTP client and request handler
-        request_handler = DefaultRequestHandler(
-            agent_executor=CurrencyAgentExecutor(
-                azure_openai_endpoint, azure_openai_api_key, currency_exchange_mcp_server_url
-            ),
-            task_store=InMemoryTaskStore(),
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
-        )
-
-        # Start server
-        app = server.build()
-
-        # Add IdentityServiceMiddleware for authentication
-        app.add_middleware(
-            IdentityServiceA2AMiddleware,
-            agent_card=agent_card,
-            public_paths=["/.well-known/agent.json"],
+    # pylint: disable=broad-exception-caught
+    try:
+        uvicorn.run(
+            "main:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            loop=loop,
+            http=http,
+            timeout_graceful_shutdown=graceful_shutdown_timeout,
         )
-
-        uvicorn.run(app, host=host, port=port)
     except Exception as e:
         logger.error("An error occurred during server startup: %e", e)
         sys.exit(1)
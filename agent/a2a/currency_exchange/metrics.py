@@ -0,0 +1,218 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Prometheus metrics of the Currency Agent."""
+
+import os
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Seconds, from in-memory cache hits to multi-turn LLM runs
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests, until the last byte of the response.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served.",
+    multiprocess_mode="livesum",
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "Duration of LLM calls, including LLM response cache hits.",
+    ["model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens used by LLM calls, as reported by the provider.",
+    ["model", "type"],
+)
+TOOL_CALL_DURATION = Histogram(
+    "agent_tool_duration_seconds",
+    "Duration of the tool calls of the agent graph, including the wait for a concurrency slot.",
+    ["tool", "downstream", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+A2A_TASK_TRANSITIONS = Counter(
+    "a2a_task_transitions_total",
+    "A2A task status updates, by the state the task moved to.",
+    ["state"],
+)
+A2A_TASKS_IN_FLIGHT = Gauge(
+    "a2a_tasks_in_flight",
+    "A2A tasks being executed.",
+    multiprocess_mode="livesum",
+)
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records the latency and token usage of the chat model calls."""
+
+    # Called on the event loop instead of a worker thread
+    run_inline = True
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self._starts: dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            LLM_REQUEST_DURATION.labels(self.model, "ok").observe(time.perf_counter() - start)
+
+        # Provider usage of the call, or the usage of each streamed message
+        usage = (response.llm_output or {}).get("token_usage")
+        if usage:
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+        else:
+            input_tokens = output_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage_metadata = getattr(message, "usage_metadata", None)
+                    if usage_metadata:
+                        input_tokens += usage_metadata.get("input_tokens", 0)
+                        output_tokens += usage_metadata.get("output_tokens", 0)
+
+        if input_tokens:
+            LLM_TOKENS.labels(self.model, "input").inc(input_tokens)
+        if output_tokens:
+            LLM_TOKENS.labels(self.model, "output").inc(output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            LLM_REQUEST_DURATION.labels(self.model, "error").observe(time.perf_counter() - start)
+
+
+def _flatten(prefix: str, stats: dict[str, Any]) -> Iterator[tuple[str, str | None, float]]:
+    """Yield the metric name, the name label and the value of every number of a stats dict.
+
+    A dict of numbers, such as calls per tool, becomes one labeled metric. A
+    dict of dicts, such as counters per downstream, one labeled metric per
+    inner key.
+    """
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, (int, float)):
+            yield name, None, value
+        elif isinstance(value, dict):
+            if value and all(isinstance(v, dict) for v in value.values()):
+                for label, inner in value.items():
+                    for inner_name, _, inner_value in _flatten(name, inner):
+                        yield inner_name, str(label), inner_value
+            elif all(isinstance(v, (int, float)) for v in value.values()):
+                for label, inner_value in value.items():
+                    yield name, str(label), inner_value
+            else:
+                yield from _flatten(name, value)
+
+
+class StatsCollector:
+    """Exposes the stats() counters of the caches and limiters as gauges.
+
+    The counters are read when /metrics is scraped, so the hot paths keep
+    incrementing plain attributes.
+    """
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def register(self, name: str, stats: Callable[[], dict[str, Any]]) -> None:
+        """Expose the stats of a component under the name prefix, replacing a previous one."""
+        self._sources[name] = stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        """Return a gauge per counter of every registered component."""
+        families: dict[str, GaugeMetricFamily] = {}
+        for prefix, stats in list(self._sources.items()):
+            for name, label, value in _flatten(prefix, stats()):
+                family = families.get(name)
+                if family is None:
+                    family = families[name] = GaugeMetricFamily(
+                        name,
+                        f"{name.replace('_', ' ')} from {prefix}.stats().",
+                        labels=["name"] if label is not None else None,
+                    )
+                family.add_metric([label] if label is not None else [], value)
+
+        return iter(families.values())
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency of every HTTP request per route.
+
+    Paths outside of ``routes`` are recorded as "other", so unknown paths
+    cannot grow the number of series.
+    """
+
+    def __init__(self, app, routes: list[str]) -> None:
+        self.app = app
+        self.routes = set(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"].rstrip("/") or "/"
+        route = path if path in self.routes else "other"
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+async def metrics_endpoint(_: Request) -> Response:
+    """Return the metrics in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set, the histograms and counters of every
+    worker process are aggregated, the stats gauges are the scraped worker's.
+    """
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        registry.register(stats_collector)
+
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
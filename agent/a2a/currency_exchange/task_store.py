@@ -0,0 +1,304 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Task store backends for the A2A request handler."""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+import aiosqlite
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = (
+    TaskState.completed,
+    TaskState.canceled,
+    TaskState.failed,
+    TaskState.rejected,
+)
+
+# States that end a request without ending the task, the follow-up may reach another worker
+INTERRUPTED_STATES = (
+    TaskState.input_required,
+    TaskState.auth_required,
+)
+
+
+class SqliteTaskStore(TaskStore):
+    """SQLite (WAL) task store shared by the worker processes of the agent.
+
+    Tasks are indexed by id and context id. Intermediate status updates are
+    coalesced per task and written in one transaction every ``flush_interval``
+    seconds, while new tasks and tasks ending a request, terminal or waiting for
+    input, are written immediately so they are visible to the other workers.
+    A canceled task is never overwritten, so a worker canceling a task another
+    worker runs wins over the late updates of the running one. Terminal tasks are expired ``task_ttl`` seconds after their last update,
+    tasks left in any other state after ``stale_task_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        task_ttl: float = 3600.0,
+        stale_task_ttl: float = 86400.0,
+        flush_interval: float = 0.05,
+        cleanup_interval: float = 300.0,
+    ) -> None:
+        """Initialize the task store.
+
+        The database is opened on first use, on the event loop serving the requests.
+
+        Args:
+            path: The path of the SQLite database.
+            task_ttl: The seconds terminal tasks are kept after their last update.
+            stale_task_ttl: The seconds non terminal tasks are kept after their last update.
+            flush_interval: The seconds intermediate status updates are buffered, 0 to write them immediately.
+            cleanup_interval: The seconds between expiries of old tasks, 0 to disable.
+        """
+        self.path = path
+        self.task_ttl = task_ttl
+        self.stale_task_ttl = stale_task_ttl
+        self.flush_interval = flush_interval
+        self.cleanup_interval = cleanup_interval
+
+        self.conn: aiosqlite.Connection | None = None
+        self.lock = asyncio.Lock()
+        self._pending: dict[str, Task] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._cleanup_task: asyncio.Task | None = None
+
+        self.flushes = 0
+        self.coalesced_writes = 0
+        self.expired = 0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """Open the database and create the tasks table, once."""
+        async with self.lock:
+            if self.conn is not None:
+                return self.conn
+
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = await aiosqlite.connect(self.path)
+            await conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                PRAGMA busy_timeout=5000;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    context_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS tasks_context_id ON tasks (context_id);
+                CREATE INDEX IF NOT EXISTS tasks_state_updated_at ON tasks (state, updated_at);
+                """
+            )
+            await conn.commit()
+            self.conn = conn
+
+            if self.cleanup_interval > 0:
+                self._cleanup_task = asyncio.create_task(self.run_cleanup())
+
+            logger.debug("Opened task store %s", self.path)
+
+            return conn
+
+    async def _write(self, conn: aiosqlite.Connection, tasks: list[Task]) -> None:
+        # A task canceled by any worker stays canceled, later updates of the
+        # worker still running it are dropped
+        now = time.time()
+        await conn.executemany(
+            """
+            INSERT INTO tasks (id, context_id, state, updated_at, data)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                context_id = excluded.context_id,
+                state = excluded.state,
+                updated_at = excluded.updated_at,
+                data = excluded.data
+            WHERE tasks.state != 'canceled'
+            """,
+            [
+                (
+                    task.id,
+                    task.context_id,
+                    task.status.state.value,
+                    now,
+                    task.model_dump_json(),
+                )
+                for task in tasks
+            ],
+        )
+        await conn.commit()
+
+    async def save(self, task: Task) -> None:
+        """Save a task, buffering intermediate status updates of known tasks."""
+        conn = await self._connect()
+
+        if (
+            self.flush_interval > 0
+            and task.status.state not in TERMINAL_STATES
+            and task.status.state not in INTERRUPTED_STATES
+            and task.status.state != TaskState.submitted
+        ):
+            if task.id in self._pending:
+                self.coalesced_writes += 1
+            self._pending[task.id] = task
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_later())
+            return
+
+        async with self.lock:
+            self._pending.pop(task.id, None)
+            await self._write(conn, [task])
+        logger.debug("Task %s saved successfully.", task.id)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered status updates in one transaction."""
+        if not self._pending or self.conn is None:
+            return
+
+        async with self.lock:
+            tasks = list(self._pending.values())
+            self._pending.clear()
+            await self._write(self.conn, tasks)
+            self.flushes += 1
+        logger.debug("Flushed %d buffered task updates", len(tasks))
+
+    async def get(self, task_id: str) -> Task | None:
+        """Retrieve a task by id."""
+        task = self._pending.get(task_id)
+        if task is not None:
+            return task
+
+        conn = await self._connect()
+        async with self.lock:
+            cursor = await conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,))
+            row = await cursor.fetchone()
+
+        if row is None:
+            logger.debug("Task %s not found in store.", task_id)
+            return None
+
+        return Task.model_validate_json(row[0])
+
+    async def is_canceled(self, task_id: str) -> bool:
+        """Return whether a task has been canceled, possibly by another worker."""
+        conn = await self._connect()
+        async with self.lock:
+            cursor = await conn.execute("SELECT state FROM tasks WHERE id = ?", (task_id,))
+            row = await cursor.fetchone()
+
+        return row is not None and row[0] == TaskState.canceled.value
+
+    async def get_by_context(self, context_id: str) -> list[Task]:
+        """Retrieve the tasks of a context, oldest first."""
+        await self._connect()
+        await self.flush()
+
+        async with self.lock:
+            cursor = await self.conn.execute(
+                "SELECT data FROM tasks WHERE context_id = ? ORDER BY updated_at",
+                (context_id,),
+            )
+            rows = await cursor.fetchall()
+
+        return [Task.model_validate_json(row[0]) for row in rows]
+
+    async def delete(self, task_id: str) -> None:
+        """Delete a task by id."""
+        conn = await self._connect()
+
+        async with self.lock:
+            self._pending.pop(task_id, None)
+            await conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            await conn.commit()
+
+    async def expire(self) -> int:
+        """Delete the tasks past their TTL and return the WAL to the database file.
+
+        Returns:
+            The number of deleted tasks.
+        """
+        conn = await self._connect()
+        await self.flush()
+
+        now = time.time()
+        terminal_states = [state.value for state in TERMINAL_STATES]
+        async with self.lock:
+            cursor = await conn.execute(
+                f"""
+                DELETE FROM tasks
+                WHERE (state IN ({", ".join("?" * len(terminal_states))}) AND updated_at < ?)
+                OR updated_at < ?
+                """,
+                (*terminal_states, now - self.task_ttl, now - self.stale_task_ttl),
+            )
+            deleted = cursor.rowcount
+            await conn.commit()
+            await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        self.expired += deleted
+        if deleted:
+            logger.info("Expired %d tasks", deleted)
+
+        return deleted
+
+    async def run_cleanup(self) -> None:
+        """Expire old tasks every cleanup interval until cancelled."""
+        # pylint: disable=broad-exception-caught
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.expire()
+            except Exception as e:
+                logger.error("Failed to expire tasks: %s", e)
+
+    async def close(self) -> None:
+        """Flush the buffered updates and close the database."""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+        await self.flush()
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+
+def create_task_store(
+    url: str,
+    task_ttl: float = 3600.0,
+    stale_task_ttl: float = 86400.0,
+    flush_interval: float = 0.05,
+    cleanup_interval: float = 300.0,
+) -> TaskStore:
+    """Create the task store for a backend URL.
+
+    Args:
+        url: "memory" for an unbounded in-process store, or "sqlite:///<path>" for a SQLite store shared by workers.
+        task_ttl: The seconds terminal tasks are kept by the SQLite store.
+        stale_task_ttl: The seconds non terminal tasks are kept by the SQLite store.
+        flush_interval: The seconds intermediate status updates are buffered by the SQLite store.
+        cleanup_interval: The seconds between expiries of old tasks by the SQLite store.
+    """
+    if url == "memory":
+        return InMemoryTaskStore()
+
+    if url.startswith("sqlite:///"):
+        return SqliteTaskStore(
+            url.removeprefix("sqlite:///"),
+            task_ttl=task_ttl,
+            stale_task_ttl=stale_task_ttl,
+            flush_interval=flush_interval,
+            cleanup_interval=cleanup_interval,
+        )
+
+    raise ValueError(f"Unsupported task store URL: {url}")
@@ -0,0 +1,182 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Process-wide Identity Service access token cache."""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from identityservice.auth.httpx import IdentityServiceAuth
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+
+def token_expiry(access_token: str, default_ttl: float) -> float:
+    """Return the expiry time of a JWT access token, or now plus the default TTL if it has none."""
+    # pylint: disable=broad-exception-caught
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return time.time() + default_ttl
+
+
+class TokenCache:
+    """Caches access tokens per audience and refreshes them in the background before they expire."""
+
+    def __init__(self, refresh_margin: float = 60.0, default_ttl: float = 300.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            refresh_margin: Seconds before expiry at which a token is refreshed in the background.
+            default_ttl: Seconds a token without an "exp" claim is considered valid.
+        """
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+
+        self._tokens: dict[Hashable, tuple[str, float]] = {}
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.fetch_seconds_total = 0.0
+        self.fetch_seconds_max = 0.0
+
+    async def get_token(self, key: Hashable, fetch: Callable[[], str]) -> str:
+        """Return a valid access token for the key.
+
+        Args:
+            key: The audience of the token, such as the agentic service and tool name.
+            fetch: The blocking function issuing a new token, run in a worker thread.
+        """
+        now = time.time()
+        cached = self._tokens.get(key)
+
+        if cached is not None and cached[1] > now:
+            self.hits += 1
+            if cached[1] - now < self.refresh_margin and key not in self._inflight:
+                self.refreshes += 1
+                self._refresh(key, fetch)
+
+            return cached[0]
+
+        self.misses += 1
+        task = self._inflight.get(key) or self._refresh(key, fetch)
+
+        return await asyncio.shield(task)
+
+    def get_token_sync(self, key: Hashable, fetch: Callable[[], str]) -> str:
+        """Return a valid access token for the key from a synchronous caller."""
+        cached = self._tokens.get(key)
+        if cached is not None and cached[1] - self.refresh_margin > time.time():
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+
+        return self._fetch(key, fetch)
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], str]) -> asyncio.Task:
+        """Start a single in-flight fetch for the key, shared by concurrent callers."""
+        task = asyncio.ensure_future(asyncio.to_thread(self._fetch, key, fetch))
+        task.add_done_callback(lambda t: self._done(key, t))
+        self._inflight[key] = task
+
+        return task
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Failed to issue access token for %s: %s", key, task.exception())
+
+    def _fetch(self, key: Hashable, fetch: Callable[[], str]) -> str:
+        start = time.perf_counter()
+        try:
+            access_token = fetch()
+        except Exception:
+            self.fetch_errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.fetches += 1
+            self.fetch_seconds_total += elapsed
+            self.fetch_seconds_max = max(self.fetch_seconds_max, elapsed)
+
+        self._tokens[key] = (access_token, token_expiry(access_token, self.default_ttl))
+        logger.debug("Issued new access token for %s in %.3fs", key, elapsed)
+
+        return access_token
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._tokens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "fetch_seconds_avg": self.fetch_seconds_total / self.fetches if self.fetches else 0.0,
+            "fetch_seconds_max": self.fetch_seconds_max,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache()
+
+
+class CachedIdentityServiceAuth(IdentityServiceAuth):
+    """IdentityServiceAuth serving access tokens from the process-wide token cache."""
+
+    def __init__(
+        self,
+        agentic_service_id: str | None = None,
+        cache: TokenCache | None = None,
+        issue_token: Callable[..., str] | None = None,
+    ):
+        """Initialize the auth.
+
+        Args:
+            agentic_service_id: The ID of the Agentic Service to authorize for.
+            cache: The token cache, defaults to the process-wide cache.
+            issue_token: The function issuing tokens, defaults to the Identity Service SDK.
+        """
+        if issue_token is None:
+            super().__init__(agentic_service_id)
+            issue_token = self.sdk.access_token
+        else:
+            self.agentic_service_id = agentic_service_id
+
+        self.cache = cache or token_cache
+        self.issue_token = issue_token
+
+    def _issue(self) -> str:
+        return self.issue_token(agentic_service_id=self.agentic_service_id)
+
+    def auth_flow(self, request):
+        """Add the Authorization header to the request."""
+        access_token = self.cache.get_token_sync(self.agentic_service_id, self._issue)
+
+        request.headers["Authorization"] = f"Bearer {access_token}"
+        yield request
+
+    async def async_auth_flow(self, request):
+        """Add the Authorization header to the request without blocking the event loop."""
+        with tracer.start_as_current_span("identity_service.access_token"):
+            access_token = await self.cache.get_token(self.agentic_service_id, self._issue)
+
+        request.headers["Authorization"] = f"Bearer {access_token}"
+        yield request
@@ -2,15 +2,23 @@
 # SPDX-License-Identifier: Apache-2.0
 """Main entry point for the Financial Assistant Agent server."""
 
-from identityservice.auth.httpx import IdentityServiceAuth
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 
 from currency_exchange_agent import CurrencyExchangeAgent
+from llm_cache import LLMResponseCache
+from metrics import LLMMetricsCallback
+from token_cache import CachedIdentityServiceAuth
+from tool_limiter import ToolLimiter
 
-memory = MemorySaver()
+MODEL_NAME = "gpt-3.5-turbo"
 
 
 class FinancialAssistantAgent:
@@ -32,6 +40,15 @@ class FinancialAssistantAgent:
         azure_openai_api_key,
         currency_exchange_mcp_server_url,
         currency_exchange_agent_url,
+        currency_exchange_agent_timeout: float = 120.0,
+        currency_exchange_agent_max_concurrency: int = 10,
+        mcp_max_concurrency: int = 16,
+        tool_max_concurrency: int = 8,
+        llm_cache_max_size: int = 1024,
+        llm_cache_ttl: float = 3600.0,
+        llm_cache_rate_ttl: float = 180.0,
+        llm_cache_rate_max_age: float = 120.0,
+        llm_cache_semantic_threshold: float = 0.0,
     ) -> None:
         """Initialize the agent with the Azure OpenAI model and tools."""
         self.azure_openai_endpoint = azure_openai_endpoint
@@ -39,41 +56,135 @@ class FinancialAssistantAgent:
         self.currency_exchange_mcp_server_url = currency_exchange_mcp_server_url
         self.currency_exchange_agent_url = currency_exchange_agent_url
 
+        # Long-lived handoff client, its connection pool and agent card are
+        # reused across graph invocations
+        self.currency_exchange_agent = CurrencyExchangeAgent(
+            currency_exchange_agent_url,
+            timeout=currency_exchange_agent_timeout,
+            max_concurrency=currency_exchange_agent_max_concurrency,
+        )
+
+        # Tool calls of a turn run concurrently, bounded per tool and per
+        # downstream MCP Server and currency exchange agent
+        self.tool_limiter = ToolLimiter(max_concurrency_per_tool=tool_max_concurrency)
+        self.tool_limiter.add_downstream("currency_exchange_mcp", mcp_max_concurrency)
+        self.tool_limiter.add_downstream(
+            "currency_exchange_agent", currency_exchange_agent_max_concurrency
+        )
+
+        # Repeated prompts are answered from the cache, 0 entries to disable
+        self.llm_cache = (
+            LLMResponseCache(
+                max_size=llm_cache_max_size,
+                ttl=llm_cache_ttl,
+                rate_ttl=llm_cache_rate_ttl,
+                rate_max_age=llm_cache_rate_max_age,
+                semantic_threshold=llm_cache_semantic_threshold,
+            )
+            if llm_cache_max_size > 0
+            else None
+        )
+
         self.model = None
         self.graph = None
+        self._init_lock = asyncio.Lock()
 
     async def invoke(self, prompt: str):
         """Invoke the agent with the provided prompt."""
         if self.graph is None:
-            await self.init_graph()
+            async with self._init_lock:
+                if self.graph is None:
+                    await self.init_graph()
 
         if not self.graph:
             raise ValueError("Agent not initialized. Call init_model_and_tools first.")
 
         response = await self.graph.ainvoke({"messages": [("user", prompt)]})
 
+        for message in response["messages"]:
+            if isinstance(message, AIMessage):
+                self.tool_limiter.record_fan_out(len(message.tool_calls))
+
         return response
 
+    async def stream(self, prompt: str) -> AsyncIterator[dict[str, Any]]:
+        """Stream the LLM tokens and tool calls of the agent as they happen."""
+        if self.graph is None:
+            async with self._init_lock:
+                if self.graph is None:
+                    await self.init_graph()
+
+        streamed_runs = set()
+        async for event in self.graph.astream_events(
+            {"messages": [("user", prompt)]}, version="v2"
+        ):
+            kind = event["event"]
+
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content:
+                    streamed_runs.add(event["run_id"])
+                    yield {"event": "token", "data": {"content": content}}
+            elif kind == "on_chat_model_end":
+                self.tool_limiter.record_fan_out(len(event["data"]["output"].tool_calls))
+
+                # Models without token streaming only report the whole message
+                content = event["data"]["output"].content
+                if content and event["run_id"] not in streamed_runs:
+                    yield {"event": "token", "data": {"content": content}}
+                streamed_runs.discard(event["run_id"])
+            elif kind == "on_tool_start":
+                # Injected arguments, such as the graph state, are not tool input
+                tool_input = {
+                    key: value
+                    for key, value in (event["data"].get("input") or {}).items()
+                    if key != "state"
+                }
+                yield {
+                    "event": "tool_start",
+                    "data": {"id": event["run_id"], "name": event["name"], "input": tool_input},
+                }
+            elif kind == "on_custom_event" and event["name"] == "currency_exchange_agent_progress":
+                yield {"event": "progress", "data": event["data"]}
+            elif kind == "on_tool_end":
+                output = event["data"].get("output")
+                if isinstance(output, ToolMessage):
+                    output = output.content
+                yield {
+                    "event": "tool_end",
+                    "data": {"id": event["run_id"], "name": event["name"], "output": output},
+                }
+
+    async def close(self):
+        """Close the handoff client."""
+        await self.currency_exchange_agent.close()
+        self.graph = None
+
     async def init_graph(self):
         """Initialize the model and tools for the agent."""
         # Set up the Azure OpenAI model via AI Gateway
         self.model = ChatOpenAI(
             api_key=self.azure_openai_api_key,
             base_url=self.azure_openai_endpoint,
-            model="gpt-3.5-turbo",  # Specify the model explicitly
+            model=MODEL_NAME,  # Specify the model explicitly
             temperature=0.2,
             max_completion_tokens=1000,
             top_p=0.5,
             default_headers={"Authorization": f"Bearer {self.azure_openai_api_key}"},
+            cache=self.llm_cache,
+            callbacks=[LLMMetricsCallback(MODEL_NAME)],
         )
 
-        # Create the currency exchange agent
-        invoke_currency_exchange_agent = CurrencyExchangeAgent(
-            self.currency_exchange_agent_url
-        ).get_invoke_tool()
+        # Create the currency exchange agent handoff tool, the only tool of its
+        # downstream, so the agent's own limit applies instead of the per-tool one
+        invoke_currency_exchange_agent = self.tool_limiter.wrap(
+            [tool(self.currency_exchange_agent.get_invoke_tool())],
+            "currency_exchange_agent",
+            limit_per_tool=False,
+        )
 
-        # Init auth
-        auth = IdentityServiceAuth()
+        # Init auth, tokens are shared through the process-wide token cache
+        auth = CachedIdentityServiceAuth()
 
         # Load tools from the MCP Server
         client = MultiServerMCPClient(
@@ -85,11 +196,12 @@ class FinancialAssistantAgent:
                 },
             }
         )
-        tools = await client.get_tools()
+        tools = self.tool_limiter.wrap(await client.get_tools(), "currency_exchange_mcp")
 
         # Create the agent with the tools
         self.graph = create_react_agent(
             model=self.model,
-            tools=[invoke_currency_exchange_agent, *tools],
+            tools=[*invoke_currency_exchange_agent, *tools],
             prompt=self.SYSTEM_INSTRUCTION,
+            version="v2",
         )
@@ -2,44 +2,197 @@
 # SPDX-License-Identifier: Apache-2.0
 """Main entry point for the AgentExecutor API server."""
 
+import asyncio
+import json
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from opentelemetry import trace
+from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
+from deadline import deadline
+from metrics import MetricsMiddleware, metrics_endpoint
+from response import PROJECTIONS, Projection, project_response
+from tracing import shutdown_tracing
+
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
 
-app = FastAPI()
-app.add_middleware(
-    CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
-)
+class ClientDisconnectedError(Exception):
+    """The client disconnected before the response was ready."""
 
 
 class AgentExecutor:
     """Simple AgentExecutor API."""
 
-    def __init__(self, agent):
+    def __init__(
+        self,
+        agent,
+        response_projection: Projection = "answer",
+        request_timeout: float = 120.0,
+    ):
         self.agent = agent
+        self.response_projection = response_projection
+        self.request_timeout = request_timeout
+
+    async def _invoke(self, prompt: str):
+        """Invoke the agent within the request deadline."""
+        with tracer.start_as_current_span("invoke_agent financial_assistant"):
+            async with deadline(self.request_timeout):
+                return await self.agent.invoke(prompt)
+
+    @staticmethod
+    async def _wait_for_disconnect(request: Request):
+        """Return once the client has disconnected, the request body must be read first."""
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    async def _run_until_disconnected(self, request: Request, coroutine):
+        """Run the coroutine, canceling it if the client disconnects first.
+
+        Returns the coroutine's result, or raises ClientDisconnectedError if
+        the client went away first.
+        """
+        work = asyncio.ensure_future(coroutine)
+        disconnect = asyncio.ensure_future(self._wait_for_disconnect(request))
+        try:
+            await asyncio.wait((work, disconnect), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+            if not work.done():
+                # Stop the LLM, MCP and handoff calls of the abandoned request
+                work.cancel()
+                await asyncio.wait((work,))
+
+        if work.cancelled():
+            raise ClientDisconnectedError()
+        return work.result()
 
     def build(self):
+        @asynccontextmanager
+        async def lifespan(_: FastAPI):
+            yield
+
+            # In-flight requests are drained by uvicorn before the lifespan ends
+            await self.agent.close()
+            shutdown_tracing()
+
+        app = FastAPI(lifespan=lifespan)
+        app.add_middleware(
+            CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
+        )
+
+        app.add_middleware(
+            MetricsMiddleware, routes=["/", "/invoke", "/stream", "/metrics"]
+        )
+
+        # Outermost, so the server span covers the whole request and continues
+        # the trace context sent by the UI
+        app.add_middleware(OpenTelemetryMiddleware, excluded_urls="metrics")
+
         # Get the UI directory path
         ui_dir = Path(__file__).parent / "ui"
         
         async def invoke(request: Request):
             """Invoke the agent with the provided request."""
+            projection = request.query_params.get("projection", self.response_projection)
+            if projection not in PROJECTIONS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unsupported projection {projection}, expected one of {', '.join(PROJECTIONS)}",
+                )
+
             req = await request.json()
             prompt = req.get("prompt")
             logger.info("Received prompt: %s", prompt)
 
-            return await self.agent.invoke(prompt)
+            try:
+                state = await self._run_until_disconnected(request, self._invoke(prompt))
+            except ClientDisconnectedError:
+                logger.info("Client disconnected, canceled the request")
+                # Nobody reads it, 499 is the de facto client closed request status
+                return Response(status_code=499)
+            except TimeoutError as e:
+                raise HTTPException(
+                    status_code=504,
+                    detail=f"The request timed out after {self.request_timeout} seconds",
+                ) from e
+
+            # Serialized by pydantic directly, bypassing FastAPI's generic encoder
+            return Response(
+                content=project_response(state, projection).model_dump_json(
+                    exclude_none=True, fallback=str
+                ),
+                media_type="application/json",
+            )
+
+        async def stream(request: Request):
+            """Stream the agent's tokens and tool calls as Server-Sent Events."""
+            req = await request.json()
+            prompt = req.get("prompt")
+            logger.info("Received prompt: %s", prompt)
+
+            async def produce(queue: asyncio.Queue):
+                """Run the graph within the request deadline, queueing its events."""
+                # pylint: disable=broad-exception-caught
+                try:
+                    with tracer.start_as_current_span("stream_agent financial_assistant"):
+                        async with deadline(self.request_timeout):
+                            async for event in self.agent.stream(prompt):
+                                await queue.put(
+                                    f"event: {event['event']}\n"
+                                    f"data: {json.dumps(event['data'], default=str)}\n\n"
+                                )
+                except TimeoutError:
+                    message = f"The request timed out after {self.request_timeout} seconds"
+                    await queue.put(f"event: error\ndata: {json.dumps({'message': message})}\n\n")
+                except Exception as e:
+                    logger.error("An error occurred while streaming the response: %s", e)
+                    await queue.put(f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n")
+                finally:
+                    queue.put_nowait(None)
+
+            async def events():
+                # Flush the headers right away, before the first LLM token
+                yield "event: start\ndata: {}\n\n"
+
+                # The graph runs in its own task, so the deadline never fires
+                # while this generator is suspended in the response
+                queue: asyncio.Queue = asyncio.Queue()
+                producer = asyncio.create_task(produce(queue))
+                try:
+                    while (chunk := await queue.get()) is not None:
+                        yield chunk
+                finally:
+                    # A client disconnect closes this generator, stop the graph run
+                    producer.cancel()
+
+                yield "event: done\ndata: {}\n\n"
+
+            return StreamingResponse(
+                events(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
         # Add the /invoke endpoint for the backend API
         app.post("/invoke")(invoke)
 
+        # Add the /stream endpoint for incremental responses
+        app.post("/stream")(stream)
+
+        # Add the Prometheus /metrics endpoint
+        app.add_route("/metrics", metrics_endpoint)
+
         # Serve static files from the ui directory
         if ui_dir.exists():
             app.mount("/static", StaticFiles(directory=ui_dir), name="static")
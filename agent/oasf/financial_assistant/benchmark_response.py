@@ -0,0 +1,151 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark of the /invoke response size and encode time.
+
+Compares returning the whole graph state through FastAPI's generic encoder
+with the projected InvokeResponse serialized by pydantic. The graph state is
+synthetic, shaped like a conversation with MCP and A2A tool calls, so the
+benchmark runs offline.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from response import PROJECTIONS, project_response
+
+
+def build_state(turns: int, currencies: int) -> dict:
+    """Build a graph state with a rate lookup and an A2A handoff per turn."""
+    rates = {f"C{i:02d}": 1.0 + i / 100 for i in range(currencies)}
+    a2a_task = {
+        "id": str(uuid4()),
+        "contextId": str(uuid4()),
+        "kind": "task",
+        "status": {"state": "completed", "timestamp": "2025-01-01T00:00:00Z"},
+        "history": [
+            {
+                "role": "agent",
+                "kind": "message",
+                "messageId": uuid4().hex,
+                "parts": [{"kind": "text", "text": f"Success. Details: {rates}"}],
+            }
+            for _ in range(4)
+        ],
+    }
+
+    messages = []
+    for turn in range(turns):
+        rate_call = f"rate-{turn}"
+        handoff_call = f"handoff-{turn}"
+        messages += [
+            HumanMessage(content="How much is 1020 CAD in EUR?", id=str(uuid4())),
+            AIMessage(
+                content="",
+                id=str(uuid4()),
+                tool_calls=[
+                    {
+                        "id": rate_call,
+                        "name": "get_currency_exchange_rate",
+                        "args": {"currency_from": "CAD", "currency_to": "EUR"},
+                    }
+                ],
+                response_metadata={"model_name": "gpt-3.5-turbo", "finish_reason": "tool_calls"},
+                usage_metadata={"input_tokens": 512, "output_tokens": 24, "total_tokens": 536},
+            ),
+            ToolMessage(
+                content=json.dumps({"amount": 1.0, "base": "CAD", "date": "2025-01-01", "rates": rates}),
+                tool_call_id=rate_call,
+                name="get_currency_exchange_rate",
+                id=str(uuid4()),
+            ),
+            AIMessage(
+                content="",
+                id=str(uuid4()),
+                tool_calls=[
+                    {
+                        "id": handoff_call,
+                        "name": "invoke_currency_exchange_agent",
+                        "args": {"task_description": "Convert 1020 CAD to EUR"},
+                    }
+                ],
+                response_metadata={"model_name": "gpt-3.5-turbo", "finish_reason": "tool_calls"},
+                usage_metadata={"input_tokens": 768, "output_tokens": 32, "total_tokens": 800},
+            ),
+            ToolMessage(
+                content=json.dumps(a2a_task),
+                tool_call_id=handoff_call,
+                name="invoke_currency_exchange_agent",
+                id=str(uuid4()),
+            ),
+            AIMessage(
+                content="1020 CAD is 693.60 EUR.",
+                id=str(uuid4()),
+                response_metadata={"model_name": "gpt-3.5-turbo", "finish_reason": "stop"},
+                usage_metadata={"input_tokens": 1024, "output_tokens": 12, "total_tokens": 1036},
+            ),
+        ]
+
+    return {"messages": messages}
+
+
+def measure(encode, repeat: int) -> tuple[int, list[float]]:
+    """Return the encoded size and the encode times of repeated calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode()
+        timings.append(time.perf_counter() - start)
+
+    return len(body), timings
+
+
+def report(name: str, size: int, timings: list[float], baseline: tuple[int, float] | None):
+    """Print the size and encode time summary of an encoder."""
+    mean = statistics.mean(timings)
+    line = (
+        f"{name:<28} "
+        f"{size:>9} bytes  "
+        f"mean {mean * 1000:8.3f} ms  "
+        f"p99 {sorted(timings)[int(len(timings) * 0.99) - 1] * 1000:8.3f} ms"
+    )
+    if baseline:
+        line += f"  {baseline[0] / size:6.1f}x smaller  {baseline[1] / mean:6.1f}x faster"
+    print(line)
+
+
+def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=5, help="Conversation turns in the state.")
+    parser.add_argument("--currencies", type=int, default=30, help="Rates per tool result.")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    state = build_state(args.turns, args.currencies)
+
+    # What FastAPI does with the raw dict returned by the endpoint
+    size, timings = measure(
+        lambda: JSONResponse(content=jsonable_encoder(state)).body, args.repeat
+    )
+    report("graph state (jsonable_encoder)", size, timings, None)
+    baseline = (size, statistics.mean(timings))
+
+    for projection in PROJECTIONS:
+        size, timings = measure(
+            lambda projection=projection: project_response(
+                state, projection
+            ).model_dump_json(exclude_none=True, fallback=str),
+            args.repeat,
+        )
+        report(f"InvokeResponse ({projection})", size, timings, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,43 @@
 # SPDX-License-Identifier: Apache-2.0
 """Currency Exchange Agent for A2A interactions."""
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import aclosing
 from typing import Annotated, Any
 from uuid import uuid4
 
 import httpx
-from a2a.client import A2AClient
-from a2a.types import (GetTaskRequest, GetTaskResponse, MessageSendParams,
-                       SendMessageRequest, SendMessageResponse,
-                       SendMessageSuccessResponse, Task, TaskQueryParams)
-from identityservice.auth.httpx import IdentityServiceAuth
+from a2a.client import A2ACardResolver, A2AClient
+from a2a.types import (CancelTaskRequest, Message, MessageSendParams, Part,
+                       SendStreamingMessageRequest,
+                       SendStreamingMessageSuccessResponse, Task,
+                       TaskArtifactUpdateEvent, TaskIdParams, TaskState,
+                       TaskStatusUpdateEvent, TextPart)
+from langchain_core.callbacks import adispatch_custom_event
 from langgraph.prebuilt import InjectedState
+from opentelemetry import trace
+
+from deadline import remaining
+from token_cache import CachedIdentityServiceAuth
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# Message metadata key with the seconds left in the caller's budget
+TIMEOUT_METADATA_KEY = "timeout"
+
+# Seconds a canceled handoff waits for the remote task to be canceled
+CANCEL_TIMEOUT = 5.0
 
 
 def create_send_message_payload(
-    text: str, task_id: str | None = None, context_id: str | None = None
+    text: str,
+    task_id: str | None = None,
+    context_id: str | None = None,
+    timeout: float | None = None,
 ) -> dict[str, Any]:
     """Helper function to create the payload for sending a task."""
     payload: dict[str, Any] = {
@@ -34,6 +54,9 @@ def create_send_message_payload(
 
     if context_id:
         payload["message"]["contextId"] = context_id
+
+    if timeout is not None:
+        payload["message"]["metadata"] = {TIMEOUT_METADATA_KEY: timeout}
     return payload
 
 
@@ -46,53 +69,196 @@ def print_json_response(response: Any, description: str) -> None:
         print(f"{response.model_dump(mode='json', exclude_none=True)}\n")
 
 
-async def run_single_turn_test(client: A2AClient, state: dict) -> str:
-    """Runs a single-turn non-streaming test."""
+def get_text(parts: list[Part]) -> str:
+    """Join the text parts of a message or artifact."""
+    return "\n".join(part.root.text for part in parts if isinstance(part.root, TextPart))
 
-    text = state["messages"][0].content
-    logger.info(
-        f"Running single-turn test with text: {text}",
-    )
 
-    send_payload = create_send_message_payload(text=text)
-    request = SendMessageRequest(
+async def run_streaming_turn(
+    client: A2AClient,
+    text: str,
+    timeout: httpx.Timeout | None = None,
+    on_progress: Callable[[str, str], Awaitable[None]] | None = None,
+) -> str:
+    """Runs a single turn over a message stream, returning as soon as the final result arrives."""
+
+    logger.info("Sending a message to the currency exchange agent: %s", text)
+
+    # The remote task gets the time left in the budget of this request
+    send_payload = create_send_message_payload(
+        text=text, timeout=timeout.read if timeout is not None else None
+    )
+    request = SendStreamingMessageRequest(
         id=str(uuid4()), params=MessageSendParams(**send_payload)
     )
 
-    print("--- Single Turn Request ---")
-    # Send Message
-    send_response: SendMessageResponse = await client.send_message(request)
-    logger.info("Send message response: %s", send_response)
+    task_ids: list[str] = []
+    try:
+        return await _consume_stream(client, request, timeout, on_progress, task_ids)
+    except asyncio.CancelledError:
+        # Canceled by the caller or its deadline while the remote task runs
+        if task_ids:
+            await _cancel_remote_task(client, task_ids[-1])
+        raise
 
-    if not isinstance(send_response.root, SendMessageSuccessResponse):
-        print("received non-success response. Aborting get task ")
-        return ""
 
-    if not isinstance(send_response.root.result, Task):
-        print("received non-task response. Aborting get task ")
-        return ""
+async def _cancel_remote_task(client: A2AClient, task_id: str) -> None:
+    """Cancel the remote task of an abandoned handoff, so it stops spending LLM and tool calls."""
+    # pylint: disable=broad-exception-caught
+    try:
+        await asyncio.shield(
+            client.cancel_task(
+                CancelTaskRequest(id=str(uuid4()), params=TaskIdParams(id=task_id)),
+                http_kwargs={"timeout": CANCEL_TIMEOUT},
+            )
+        )
+        logger.info("Canceled the currency exchange agent task %s", task_id)
+    except Exception as e:
+        logger.warning("Failed to cancel the currency exchange agent task %s: %s", task_id, e)
 
-    task_id: str = send_response.root.result.id
-    print("---Query Task---")
-    # query the task
-    get_request = GetTaskRequest(id=str(uuid4()), params=TaskQueryParams(id=task_id))
-    get_response: GetTaskResponse = await client.get_task(get_request)
-    logger.info("Get task response: %s", get_response)
 
-    history = get_response.root.result.history
+async def _consume_stream(
+    client: A2AClient,
+    request: SendStreamingMessageRequest,
+    timeout: httpx.Timeout | None,
+    on_progress: Callable[[str, str], Awaitable[None]] | None,
+    task_ids: list[str],
+) -> str:
+    """Consume the message stream, recording the remote task id, and return the final text."""
+    # Closed on return, so the connection goes back to the pool right away
+    async with aclosing(
+        client.send_message_streaming(request, http_kwargs={"timeout": timeout})
+    ) as stream:
+        async for response in stream:
+            if not isinstance(response.root, SendStreamingMessageSuccessResponse):
+                logger.error("Received non-success streaming response: %s", response)
+                return ""
 
-    return history[len(history) - 1].parts[0].root.text if len(history) > 0 else ""
+            event = response.root.result
+            task_id = event.id if isinstance(event, Task) else event.taskId
+            if task_id and not task_ids:
+                task_ids.append(task_id)
+                trace.get_current_span().set_attribute("a2a.task_id", task_id)
+
+            if isinstance(event, Message):
+                return get_text(event.parts)
+
+            if isinstance(event, TaskArtifactUpdateEvent):
+                return get_text(event.artifact.parts)
+
+            if isinstance(event, TaskStatusUpdateEvent):
+                message_text = (
+                    get_text(event.status.message.parts) if event.status.message else ""
+                )
+                if event.final:
+                    return message_text
+                if on_progress is not None:
+                    await on_progress(event.status.state.value, message_text)
+
+            elif isinstance(event, Task) and event.status.state in (
+                TaskState.completed,
+                TaskState.failed,
+                TaskState.canceled,
+                TaskState.rejected,
+                TaskState.input_required,
+            ):
+                if event.artifacts:
+                    return get_text(event.artifacts[-1].parts)
+                return get_text(event.status.message.parts) if event.status.message else ""
+
+    return ""
 
 
 class CurrencyExchangeAgent:
     """External A2A Currency Exchange Agent."""
 
-    def __init__(self, url):
+    def __init__(
+        self,
+        url,
+        timeout: float = 120.0,
+        connect_timeout: float = 5.0,
+        max_concurrency: int = 10,
+        agent_card_ttl: float = 300.0,
+    ):
         self.url = url
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency = max_concurrency
+        self.agent_card_ttl = agent_card_ttl
+
+        self._httpx_client: httpx.AsyncClient | None = None
+        self._client: A2AClient | None = None
+        self._agent_card_fetched_at = 0.0
+        self._client_lock = asyncio.Lock()
+
+    def _get_httpx_client(self) -> httpx.AsyncClient:
+        """Return the pooled, authenticated HTTP client shared by all handoffs."""
+        if self._httpx_client is None:
+            self._httpx_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                auth=CachedIdentityServiceAuth(),
+            )
+
+        return self._httpx_client
+
+    async def get_client(self) -> A2AClient:
+        """Return the A2A client, revalidating the agent card once it is older than the TTL."""
+        if self._client is not None and not self._agent_card_expired():
+            return self._client
+
+        async with self._client_lock:
+            if self._client is not None and not self._agent_card_expired():
+                return self._client
+
+            # pylint: disable=broad-exception-caught
+            try:
+                agent_card = await A2ACardResolver(
+                    self._get_httpx_client(), self.url
+                ).get_agent_card()
+            except Exception as e:
+                if self._client is None:
+                    raise
+
+                # Keep serving with the last known agent card
+                logger.warning("Failed to revalidate the agent card: %s", e)
+                self._agent_card_fetched_at = time.monotonic()
+                return self._client
+
+            if self._client is None or self._client.agent_card != agent_card:
+                self._client = A2AClient(self._get_httpx_client(), agent_card=agent_card)
+                logger.info("Resolved currency exchange agent at %s", agent_card.url)
+
+            self._agent_card_fetched_at = time.monotonic()
+
+            return self._client
+
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+        self._httpx_client = None
+        self._client = None
+
+    def _agent_card_expired(self) -> bool:
+        return time.monotonic() - self._agent_card_fetched_at > self.agent_card_ttl
 
     def get_invoke_tool(self):
         """Create a tool to hand off to the currency exchange agent."""
 
+        async def forward_progress(task_state: str, message: str):
+            try:
+                await adispatch_custom_event(
+                    "currency_exchange_agent_progress",
+                    {"state": task_state, "message": message},
+                )
+            except RuntimeError:
+                # Not running inside a graph run, nobody to forward to
+                pass
+
         async def invoke_currency_exchange_agent(
             task_description: Annotated[
                 str,
@@ -107,21 +273,29 @@ class CurrencyExchangeAgent:
 
             # Connect to the agent
             try:
-                timeout = httpx.Timeout(connect=None, read=None, write=None, pool=None)
-                auth = IdentityServiceAuth()
-                async with httpx.AsyncClient(
-                    timeout=timeout, auth=auth
-                ) as httpx_client:
-                    client = await A2AClient.get_client_from_agent_card_url(
-                        httpx_client,
-                        self.url,
-                    )
-                    print("Connection successful.")
+                with tracer.start_as_current_span(
+                    "handoff currency_exchange_agent",
+                    attributes={"server.address": self.url},
+                ):
+                    client = await self.get_client()
 
-                    # Test the agent with a simple query
-                    return await run_single_turn_test(client, state)
+                    # Stream the turn, forwarding progress to the graph event stream,
+                    # within what is left of the request's deadline
+                    return await run_streaming_turn(
+                        client,
+                        task_description,
+                        timeout=httpx.Timeout(
+                            remaining(self.timeout), connect=self.connect_timeout
+                        ),
+                        on_progress=forward_progress,
+                    )
 
             except Exception as e:
+                # Revalidate the agent card on the next handoff
+                self._agent_card_fetched_at = 0.0
                 logger.error("An error occurred while connecting to the agent: %s", e)
 
+                # Let the supervisor see why the handoff failed
+                return f"The handoff to the currency exchange agent failed: {e!r}"
+
         return invoke_currency_exchange_agent
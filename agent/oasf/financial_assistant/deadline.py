@@ -0,0 +1,41 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Per-request deadline flowing down the call chain."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+# Event loop time the current request must be answered by
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+@asynccontextmanager
+async def deadline(timeout: float):
+    """Cancel the work of the block once the timeout expires, raising TimeoutError.
+
+    Tasks created in the block, such as parallel tool calls, inherit the
+    deadline and can read the time left with remaining().
+    """
+    when = asyncio.get_running_loop().time() + timeout
+    # A nested deadline never extends the outer one
+    outer = _deadline.get()
+    if outer is not None:
+        when = min(when, outer)
+
+    token = _deadline.set(when)
+    try:
+        async with asyncio.timeout_at(when):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: float | None = None) -> float | None:
+    """Return the seconds left before the current deadline, or the default outside of one."""
+    when = _deadline.get()
+    if when is None:
+        return default
+
+    left = max(0.0, when - asyncio.get_running_loop().time())
+    return left if default is None else min(left, default)
@@ -0,0 +1,332 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""LLM response cache keyed on the normalized prompt and tool results."""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Currencies published by the exchange rate API
+CURRENCIES = frozenset(
+    (
+        "AUD BGN BRL CAD CHF CNY CZK DKK EUR GBP HKD HUF IDR ILS INR ISK JPY KRW "
+        "MXN MYR NOK NZD PHP PLN RON SEK SGD THB TRY USD ZAR"
+    ).split()
+)
+
+# Numbers and currency codes of the question must match exactly, in order, for
+# a semantic hit, similar questions about other amounts or currency pairs, or
+# the same pair the other way around, need their own answer
+_GUARD_TOKENS = re.compile(r"\d+(?:[.,]\d+)*|\b[A-Za-z]{3}\b")
+
+# Latest rates are published on business days, the latest rate of a weekend
+# or holiday can be a few days old
+LATEST_RATE_MAX_AGE = timedelta(days=4)
+
+
+def hashing_embedding(text: str, dimensions: int = 512) -> np.ndarray:
+    """Embed a text as the normalized hashed counts of its character trigrams.
+
+    A local embedding without a model, close for prompts differing in word
+    order, punctuation or filler words. Any other embedding function can be
+    passed to the cache instead.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    padded = f"  {text}  "
+    for i in range(len(padded) - 2):
+        digest = hashlib.blake2b(padded[i : i + 3].encode(), digest_size=4).digest()
+        vector[int.from_bytes(digest, "little") % dimensions] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class LLMResponseCache(BaseCache):
+    """LangChain cache with an exact tier and an optional semantic tier.
+
+    Prompts are keyed on their normalized messages: message and tool call ids
+    and response metadata are dropped and user text is case and whitespace
+    folded. Answers derived from live exchange rates, tool results with a
+    recent rate date or not readable as JSON, never hold rates more than
+    ``rate_ttl`` seconds old: the rates can already be ``rate_max_age``
+    seconds old when the tools return them, such as the TTL of the latest
+    rate cache of the MCP Server, so these answers are kept for
+    ``rate_ttl - rate_max_age`` seconds, and not cached when that is not
+    positive. Other answers are kept for ``ttl`` seconds.
+
+    With a ``semantic_threshold`` above 0, prompts without tool results are
+    also matched to cached prompts by cosine similarity of the embeddings of
+    their last user message, provided the rest of the conversation, system
+    prompt included, is identical and the message mentions the same numbers
+    and currency codes in the same order.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 3600.0,
+        rate_ttl: float = 120.0,
+        rate_max_age: float = 60.0,
+        semantic_threshold: float = 0.0,
+        embed: Callable[[str], Sequence[float]] = hashing_embedding,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: The maximum number of responses kept before evicting the least recently used.
+            ttl: The seconds responses not depending on live exchange rates are kept.
+            rate_ttl: The maximum age in seconds of the live exchange rates of a cached response.
+            rate_max_age: The maximum age in seconds of the live exchange rates returned by the tools.
+            semantic_threshold: The minimum cosine similarity of a semantic hit, 0 to disable the semantic tier.
+            embed: The function embedding the normalized last user message for the semantic tier.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.rate_ttl = rate_ttl
+        self.rate_max_age = rate_max_age
+        self.semantic_threshold = semantic_threshold
+        self.embed = embed
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, RETURN_VAL_TYPE]] = OrderedDict()
+
+        # Semantic index: one row per cached prompt without tool results
+        self._index_keys: list[str] = []
+        self._index_guards: list[tuple] = []
+        self._index_vectors: np.ndarray | None = None
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(prompt: str) -> tuple[str, list[str]]:
+        """Return the normalized prompt and its tool results."""
+        try:
+            messages = json.loads(prompt)
+        except ValueError:
+            return _WHITESPACE.sub(" ", prompt).strip(), []
+
+        normalized = []
+        tool_results = []
+        for message in messages:
+            kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+            message_type = kwargs.get("type")
+            content = kwargs.get("content", "")
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True)
+
+            content = _WHITESPACE.sub(" ", content).strip()
+            if message_type == "human":
+                content = content.casefold()
+            if message_type == "tool":
+                tool_results.append(content)
+
+            normalized.append(
+                {
+                    "type": message_type,
+                    "name": kwargs.get("name"),
+                    "content": content,
+                    "tool_calls": [
+                        [tool_call.get("name"), tool_call.get("args")]
+                        for tool_call in kwargs.get("tool_calls", [])
+                    ],
+                }
+            )
+
+        return json.dumps(normalized, sort_keys=True), tool_results
+
+    def ttl_for(self, tool_results: list[str]) -> float:
+        """Return the TTL of a response given the tool results its prompt holds."""
+        oldest_live_date = (date.today() - LATEST_RATE_MAX_AGE).isoformat()
+        live_ttl = self.rate_ttl - self.rate_max_age
+
+        for result in tool_results:
+            try:
+                payload = json.loads(result)
+            except ValueError:
+                # Unknown results, such as agent answers, may carry live rates
+                return live_ttl
+
+            rate_date = payload.get("date") if isinstance(payload, dict) else None
+            if rate_date is None or rate_date >= oldest_live_date:
+                return live_ttl
+
+        return self.ttl
+
+    @staticmethod
+    def _key(normalized: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{normalized}".encode()).hexdigest()
+
+    @staticmethod
+    def _question(normalized: str) -> tuple[str, str]:
+        """Return the last user message of a normalized prompt and a digest of the other messages."""
+        try:
+            messages = json.loads(normalized)
+        except ValueError:
+            return normalized, ""
+        if not isinstance(messages, list):
+            return normalized, ""
+
+        last = max(
+            (i for i, message in enumerate(messages) if message.get("type") == "human"),
+            default=None,
+        )
+        if last is None:
+            return "", hashlib.sha256(normalized.encode()).hexdigest()
+
+        context = json.dumps(messages[:last] + messages[last + 1 :], sort_keys=True)
+        return messages[last]["content"], hashlib.sha256(context.encode()).hexdigest()
+
+    @staticmethod
+    def _guard(question: str, context: str, llm_string: str) -> tuple:
+        tokens = [
+            token.upper()
+            for token in _GUARD_TOKENS.findall(question)
+            if token[0].isdigit() or token.upper() in CURRENCIES
+        ]
+        return (llm_string, context, *tokens)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        """Return the cached response of the prompt, or None on a miss."""
+        normalized, tool_results = self.normalize(prompt)
+        key = self._key(normalized, llm_string)
+
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            if self.semantic_threshold > 0 and not tool_results:
+                value = self._semantic_get(normalized, llm_string)
+                if value is not None:
+                    self.semantic_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Cache the response of the prompt."""
+        normalized, tool_results = self.normalize(prompt)
+        ttl = self.ttl_for(tool_results)
+        if ttl <= 0:
+            return
+
+        key = self._key(normalized, llm_string)
+        expires_at = time.time() + ttl
+
+        with self._lock:
+            is_new = key not in self._entries
+            self._entries[key] = (expires_at, return_val)
+            self._entries.move_to_end(key)
+
+            if is_new and self.semantic_threshold > 0 and not tool_results:
+                self._index_add(key, normalized, llm_string)
+
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self._index_remove(evicted)
+                self.evictions += 1
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        """Return the cached response of the prompt, without a worker thread."""
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Cache the response of the prompt, without a worker thread."""
+        self.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._index_keys.clear()
+            self._index_guards.clear()
+            self._index_vectors = None
+
+    async def aclear(self, **kwargs: Any) -> None:
+        """Drop all cached responses."""
+        self.clear(**kwargs)
+
+    def _get(self, key: str) -> RETURN_VAL_TYPE | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self._index_remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _semantic_get(self, normalized: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        if self._index_vectors is None:
+            return None
+
+        question, context = self._question(normalized)
+        guard = self._guard(question, context, llm_string)
+        candidates = [i for i, g in enumerate(self._index_guards) if g == guard]
+        if not candidates:
+            return None
+
+        vector = np.asarray(self.embed(question), dtype=np.float32)
+        similarities = self._index_vectors[candidates] @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_threshold:
+            return None
+
+        return self._get(self._index_keys[candidates[best]])
+
+    def _index_add(self, key: str, normalized: str, llm_string: str) -> None:
+        question, context = self._question(normalized)
+        vector = np.asarray(self.embed(question), dtype=np.float32)[np.newaxis, :]
+        self._index_keys.append(key)
+        self._index_guards.append(self._guard(question, context, llm_string))
+        self._index_vectors = (
+            vector
+            if self._index_vectors is None
+            else np.concatenate([self._index_vectors, vector])
+        )
+
+    def _index_remove(self, key: str) -> None:
+        if key not in self._index_keys:
+            return
+
+        i = self._index_keys.index(key)
+        del self._index_keys[i]
+        del self._index_guards[i]
+        self._index_vectors = (
+            np.delete(self._index_vectors, i, axis=0) if self._index_keys else None
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        lookups = self.hits + self.semantic_hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "semantic_index_size": len(self._index_keys),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
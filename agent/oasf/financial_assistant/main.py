@@ -9,9 +9,14 @@ import sys
 import click
 import uvicorn
 from dotenv import load_dotenv
+from fastapi import FastAPI
 
 from agent import FinancialAssistantAgent
 from agent_executor import AgentExecutor
+from metrics import stats_collector
+from response import PROJECTIONS
+from token_cache import token_cache
+from tracing import setup_tracing
 
 load_dotenv()
 
@@ -19,8 +24,67 @@ logging.basicConfig(level=os.getenv("LOG_LEVEL", "DEBUG").upper())
 logger = logging.getLogger(__name__)
 
 
+def create_app() -> FastAPI:
+    """Create the Financial Assistant Agent application from the environment.
+
+    Every worker process calls this factory, so the agent, its graph and the
+    handoff client are created per worker.
+    """
+    setup_tracing("financial-assistant")
+
+    # Initialize the agent with capabilities and skills
+    agent = FinancialAssistantAgent(
+        azure_openai_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""),
+        azure_openai_api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
+        currency_exchange_mcp_server_url=os.getenv(
+            "CURRENCY_EXCHANGE_MCP_SERVER_URL", "http://localhost:9090/mcp"
+        ),
+        currency_exchange_agent_url=os.getenv(
+            "CURRENCY_EXCHANGE_AGENT_URL", "http://localhost:9091"
+        ),
+        currency_exchange_agent_timeout=float(
+            os.getenv("CURRENCY_EXCHANGE_AGENT_TIMEOUT", "120")
+        ),
+        currency_exchange_agent_max_concurrency=int(
+            os.getenv("CURRENCY_EXCHANGE_AGENT_MAX_CONCURRENCY", "10")
+        ),
+        mcp_max_concurrency=int(os.getenv("MCP_MAX_CONCURRENCY", "16")),
+        tool_max_concurrency=int(os.getenv("TOOL_MAX_CONCURRENCY", "8")),
+        llm_cache_max_size=int(os.getenv("LLM_CACHE_MAX_SIZE", "1024")),
+        llm_cache_ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+        llm_cache_rate_ttl=float(os.getenv("LLM_CACHE_RATE_TTL", "180")),
+        llm_cache_rate_max_age=float(os.getenv("LLM_CACHE_RATE_MAX_AGE", "120")),
+        llm_cache_semantic_threshold=float(
+            os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD", "0")
+        ),
+    )
+
+    # Cache and limiter counters are read on every /metrics scrape
+    stats_collector.register("access_token_cache", token_cache.stats)
+    stats_collector.register("tool_limiter", agent.tool_limiter.stats)
+    if agent.llm_cache is not None:
+        stats_collector.register("llm_cache", agent.llm_cache.stats)
+
+    # Fail at startup rather than on every /invoke request
+    response_projection = os.getenv("INVOKE_RESPONSE_PROJECTION", "answer")
+    if response_projection not in PROJECTIONS:
+        raise ValueError(
+            f"Unsupported INVOKE_RESPONSE_PROJECTION: {response_projection}, "
+            f"expected one of {', '.join(PROJECTIONS)}"
+        )
+
+    # Initialize the HTTP client and request handler
+    server = AgentExecutor(
+        agent=agent,
+        response_projection=response_projection,
+        request_timeout=float(os.getenv("REQUEST_TIMEOUT", "120")),
+    )
+
+    return server.build()
+
+
 @click.command()
-@click.option("--host", "host", default="0.0.0.0")
+@click.option("--host", "host", default=os.getenv("HOST", "0.0.0.0"))
 @click.option("--port", "port", default=os.getenv("PORT", 9093), type=int)
 @click.option("--azure-openai-endpoint", default=os.getenv("AZURE_OPENAI_ENDPOINT", ""))
 @click.option("--azure-openai-api-key", default=os.getenv("AZURE_OPENAI_API_KEY", ""))
@@ -32,6 +96,48 @@ logger = logging.getLogger(__name__)
     "--currency-exchange-agent-url",
     default=os.getenv("CURRENCY_EXCHANGE_AGENT_URL", "http://localhost:9091"),
 )
+@click.option(
+    "--currency-exchange-agent-timeout",
+    default=float(os.getenv("CURRENCY_EXCHANGE_AGENT_TIMEOUT", "120")),
+    type=float,
+    help="Seconds to wait for the currency exchange agent.",
+)
+@click.option(
+    "--currency-exchange-agent-max-concurrency",
+    default=int(os.getenv("CURRENCY_EXCHANGE_AGENT_MAX_CONCURRENCY", "10")),
+    type=int,
+    help="Maximum number of concurrent handoffs to the currency exchange agent.",
+)
+@click.option(
+    "--invoke-response-projection",
+    default=os.getenv("INVOKE_RESPONSE_PROJECTION", "answer"),
+    type=click.Choice(PROJECTIONS),
+    help="Default /invoke response: the answer only, the answer and tool trace, or the full state.",
+)
+@click.option(
+    "--workers",
+    default=int(os.getenv("WORKERS", "1")),
+    type=int,
+    help="Number of worker processes.",
+)
+@click.option(
+    "--loop",
+    default=os.getenv("UVICORN_LOOP", "auto"),
+    type=click.Choice(["auto", "asyncio", "uvloop"]),
+    help="Event loop, auto selects uvloop when installed.",
+)
+@click.option(
+    "--http",
+    default=os.getenv("UVICORN_HTTP", "auto"),
+    type=click.Choice(["auto", "h11", "httptools"]),
+    help="HTTP protocol implementation, auto selects httptools when installed.",
+)
+@click.option(
+    "--graceful-shutdown-timeout",
+    default=float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30")),
+    type=float,
+    help="Seconds in-flight requests are drained for on shutdown.",
+)
 def main(
     host,
     port,
@@ -39,24 +145,44 @@ def main(
     azure_openai_api_key,
     currency_exchange_mcp_server_url,
     currency_exchange_agent_url,
+    currency_exchange_agent_timeout,
+    currency_exchange_agent_max_concurrency,
+    invoke_response_projection,
+    workers,
+    loop,
+    http,
+    graceful_shutdown_timeout,
 ):
     """Starts the Financial Assistant Agent server."""
 
+    # Worker processes build the app with create_app from the environment
+    os.environ.update(
+        {
+            "AZURE_OPENAI_ENDPOINT": azure_openai_endpoint,
+            "AZURE_OPENAI_API_KEY": azure_openai_api_key,
+            "CURRENCY_EXCHANGE_MCP_SERVER_URL": currency_exchange_mcp_server_url,
+            "CURRENCY_EXCHANGE_AGENT_URL": currency_exchange_agent_url,
+            "CURRENCY_EXCHANGE_AGENT_TIMEOUT": str(currency_exchange_agent_timeout),
+            "CURRENCY_EXCHANGE_AGENT_MAX_CONCURRENCY": str(
+                currency_exchange_agent_max_concurrency
+            ),
+            "INVOKE_RESPONSE_PROJECTION": invoke_response_projection,
+        }
+    )
+
     # pylint: disable=broad-exception-caught
     try:
-        # Initialize the agent with capabilities and skills
-        agent = FinancialAssistantAgent(
-            azure_openai_endpoint=azure_openai_endpoint,
-            azure_openai_api_key=azure_openai_api_key,
-            currency_exchange_mcp_server_url=currency_exchange_mcp_server_url,
-            currency_exchange_agent_url=currency_exchange_agent_url,
-        )
-
-        # Initialize the HTTP client and request handler
-        server = AgentExecutor(agent=agent)
-
         # Start server
-        uvicorn.run(server.build(), host=host, port=port)
+        uvicorn.run(
+            "main:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            loop=loop,
+            http=http,
+            timeout_graceful_shutdown=graceful_shutdown_timeout,
+        )
     except Exception as e:
         logger.error("An error occurred during server startup: %e", e)
         sys.exit(1)
@@ -0,0 +1,70 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Projection of the agent graph state into the /invoke response."""
+
+from typing import Any, Literal, get_args
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from pydantic import BaseModel
+
+# answer: the final answer only
+# trace: the final answer and the tool calls made to produce it
+# full: the final answer and every message of the graph state, for debugging
+Projection = Literal["answer", "trace", "full"]
+
+PROJECTIONS: tuple[str, ...] = get_args(Projection)
+
+
+# pylint: disable=too-few-public-methods
+class ToolCall(BaseModel):
+    """A tool call made by the agent and its result."""
+
+    id: str | None = None
+    name: str
+    input: dict[str, Any]
+    output: Any = None
+
+
+# pylint: disable=too-few-public-methods
+class InvokeResponse(BaseModel):
+    """The /invoke response."""
+
+    answer: str
+    tools: list[ToolCall] | None = None
+    messages: list[dict[str, Any]] | None = None
+
+
+def project_response(state: dict[str, Any], projection: Projection) -> InvokeResponse:
+    """Project the final graph state of an invocation into the /invoke response."""
+    messages: list[BaseMessage] = state.get("messages", [])
+
+    answer = next(
+        (
+            str(m.content)
+            for m in reversed(messages)
+            if isinstance(m, AIMessage) and m.content
+        ),
+        "",
+    )
+    response = InvokeResponse(answer=answer)
+
+    if projection == "trace":
+        outputs = {
+            m.tool_call_id: m.content for m in messages if isinstance(m, ToolMessage)
+        }
+        response.tools = [
+            ToolCall(
+                id=tool_call["id"],
+                name=tool_call["name"],
+                input=tool_call["args"],
+                output=outputs.get(tool_call["id"]),
+            )
+            for m in messages
+            if isinstance(m, AIMessage)
+            for tool_call in m.tool_calls
+        ]
+
+    if projection == "full":
+        response.messages = [m.model_dump(exclude_none=True) for m in messages]
+
+    return response
@@ -3,6 +3,7 @@
 """Test client for the A2A agent."""
 
 import asyncio
+import json
 import os
 import sys
 import traceback
@@ -18,6 +19,8 @@ async def main() -> None:
     """Main function to run the tests."""
 
     AGENT_URL = os.getenv("AGENT_URL", "http://0.0.0:9093/invoke")
+    # "answer", "trace" or "full", defaults to the server's INVOKE_RESPONSE_PROJECTION
+    PROJECTION = os.getenv("PROJECTION")
 
     # Connect to the agent
     print(f"Connecting to agent at {AGENT_URL}...")
@@ -31,9 +34,18 @@ async def main() -> None:
                     if len(sys.argv) > 1
                     else "How much is 1020 CAD in EUR"
                 },
+                params={"projection": PROJECTION} if PROJECTION else None,
             )
-
-            print(res.json())
+            res.raise_for_status()
+
+            # The response holds the answer, plus the tool calls or the full
+            # message history for the trace and full projections
+            response = res.json()
+            print(response["answer"])
+            for tool in response.get("tools", []):
+                print(f"{tool['name']}({tool['input']}) -> {tool.get('output')}")
+            if "messages" in response:
+                print(json.dumps(response["messages"], indent=2))
 
     except Exception as e:
         traceback.print_exc()
@@ -0,0 +1,186 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Concurrency limits for the tools called by the agent graph."""
+
+import asyncio
+import functools
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any
+
+from langchain_core.tools import BaseTool, StructuredTool
+from opentelemetry import trace
+
+from metrics import TOOL_CALL_DURATION
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+
+class ToolLimiter:
+    """Bounds concurrent tool calls per tool and per downstream service.
+
+    The tool calls of one LLM turn run concurrently in the graph, a burst of
+    them waits here instead of overwhelming the MCP Server or the agents
+    behind the tools. The limiter records how many tool calls every turn fans
+    out to, as reported by the agent, and how long calls wait for a slot.
+    """
+
+    def __init__(self, max_concurrency_per_tool: int = 0) -> None:
+        """Initialize the limiter.
+
+        Args:
+            max_concurrency_per_tool: The maximum number of concurrent calls of each tool, 0 for no limit.
+        """
+        self.max_concurrency_per_tool = max_concurrency_per_tool
+
+        self._downstreams: dict[str, asyncio.Semaphore] = {}
+        self._downstream_limits: dict[str, int] = {}
+        self._tools: dict[str, asyncio.Semaphore] = {}
+        self._unlimited_tools: set[str] = set()
+
+        self.calls: Counter[str] = Counter()
+        self.in_flight: Counter[str] = Counter()
+        self.waits: Counter[str] = Counter()
+        self.wait_time_total: Counter[str] = Counter()
+        self.wait_time_max: dict[str, float] = {}
+        self.fan_out: Counter[int] = Counter()
+
+    def add_downstream(self, name: str, max_concurrency: int) -> None:
+        """Limit the concurrent calls to a downstream service, 0 for no limit."""
+        self._downstream_limits[name] = max_concurrency
+        if max_concurrency > 0:
+            self._downstreams[name] = asyncio.Semaphore(max_concurrency)
+
+    def wrap(
+        self,
+        tools: list[BaseTool],
+        downstream: str,
+        limit_per_tool: bool = True,
+    ) -> list[BaseTool]:
+        """Return copies of the tools calling their downstream service through the limiter.
+
+        Args:
+            tools: The tools to wrap.
+            downstream: The downstream service the tools call.
+            limit_per_tool: Whether the per-tool limit applies, False for a
+                tool bounded by the limit of its own downstream service only.
+        """
+        if downstream not in self._downstream_limits:
+            self.add_downstream(downstream, 0)
+
+        wrapped = []
+        for tool in tools:
+            if not isinstance(tool, StructuredTool) or tool.coroutine is None:
+                logger.warning("Tool %s is not limited, it has no coroutine", tool.name)
+                wrapped.append(tool)
+                continue
+
+            if not limit_per_tool:
+                self._unlimited_tools.add(tool.name)
+            wrapped.append(
+                tool.model_copy(
+                    update={"coroutine": self._limited(tool.name, downstream, tool.coroutine)}
+                )
+            )
+
+        return wrapped
+
+    def _limited(self, tool_name: str, downstream: str, coroutine):
+        @functools.wraps(coroutine)
+        async def limited(*args, **kwargs):
+            outcome = "exception"
+            start = time.perf_counter()
+            try:
+                with tracer.start_as_current_span(
+                    f"execute_tool {tool_name}",
+                    attributes={"gen_ai.tool.name": tool_name, "downstream": downstream},
+                ):
+                    async with self.acquire(tool_name, downstream):
+                        result = await coroutine(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                TOOL_CALL_DURATION.labels(tool_name, downstream, outcome).observe(
+                    time.perf_counter() - start
+                )
+
+        return limited
+
+    @asynccontextmanager
+    async def acquire(self, tool_name: str, downstream: str):
+        """Hold a slot of the tool and of its downstream service for one call."""
+        start = time.perf_counter()
+        tool_semaphore = self._tool_semaphore(tool_name)
+        downstream_semaphore = self._downstreams.get(downstream)
+
+        # Always acquired in the same order, tool then downstream
+        if tool_semaphore is not None:
+            await tool_semaphore.acquire()
+        try:
+            if downstream_semaphore is not None:
+                await downstream_semaphore.acquire()
+            try:
+                self._record_wait(downstream, time.perf_counter() - start)
+                self.calls[tool_name] += 1
+                self.in_flight[downstream] += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight[downstream] -= 1
+            finally:
+                if downstream_semaphore is not None:
+                    downstream_semaphore.release()
+        finally:
+            if tool_semaphore is not None:
+                tool_semaphore.release()
+
+    def _tool_semaphore(self, tool_name: str) -> asyncio.Semaphore | None:
+        if self.max_concurrency_per_tool <= 0 or tool_name in self._unlimited_tools:
+            return None
+
+        if tool_name not in self._tools:
+            self._tools[tool_name] = asyncio.Semaphore(self.max_concurrency_per_tool)
+
+        return self._tools[tool_name]
+
+    def _record_wait(self, downstream: str, wait_time: float) -> None:
+        # Waits shorter than a millisecond did not queue behind other calls
+        if wait_time > 0.001:
+            self.waits[downstream] += 1
+        self.wait_time_total[downstream] += wait_time
+        self.wait_time_max[downstream] = max(
+            self.wait_time_max.get(downstream, 0.0), wait_time
+        )
+
+    def record_fan_out(self, tool_calls: int) -> None:
+        """Record the number of tool calls requested by one LLM turn."""
+        if tool_calls > 0:
+            self.fan_out[tool_calls] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return the fan-out and limiter counters."""
+        turns = sum(self.fan_out.values())
+        calls = sum(size * count for size, count in self.fan_out.items())
+
+        return {
+            "fan_out": {
+                "turns": turns,
+                "avg": calls / turns if turns else 0.0,
+                "max": max(self.fan_out, default=0),
+                "histogram": dict(sorted(self.fan_out.items())),
+            },
+            "tools": dict(self.calls),
+            "downstreams": {
+                name: {
+                    "max_concurrency": limit,
+                    "in_flight": self.in_flight[name],
+                    "waits": self.waits[name],
+                    "wait_time_total": self.wait_time_total[name],
+                    "wait_time_max": self.wait_time_max.get(name, 0.0),
+                }
+                for name, limit in self._downstream_limits.items()
+            },
+        }
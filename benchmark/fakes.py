@@ -0,0 +1,412 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Local stand-ins for the LLM, the Identity Service and the exchange rate API.
+
+Every fake is deterministic: the same request gets the same response after
+the same configured latency, so benchmark runs can be compared.
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import random
+import re
+import signal
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+from uuid import uuid4
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Rates against EUR, the fake exchange rate API derives every pair from them
+EUR_RATES = {
+    "EUR": 1.0,
+    "USD": 1.0842,
+    "GBP": 0.8571,
+    "JPY": 162.35,
+    "CHF": 0.9531,
+    "CAD": 1.4712,
+    "AUD": 1.6389,
+    "CNY": 7.8424,
+    "INR": 90.412,
+    "SEK": 11.437,
+}
+
+CURRENCY_PATTERN = re.compile(r"\b(" + "|".join(EUR_RATES) + r")\b")
+AMOUNT_PATTERN = re.compile(r"\b(\d+(?:\.\d+)?)\b")
+
+TOKEN_PREFIX = "fake"
+
+
+@dataclass
+class Latency:
+    """A fixed latency with a seeded jitter, in seconds."""
+
+    base: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    async def sleep(self) -> None:
+        """Wait for the next latency of the sequence."""
+        delay = self.base + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def count_tokens(text: str) -> int:
+    """Return an approximate token count, about four characters per token."""
+    return max(1, len(text) // 4)
+
+
+# Fake OpenAI-compatible chat completions
+
+
+def tool_call(name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+    """Return an OpenAI tool call."""
+    return {
+        "id": f"call_{uuid4().hex[:24]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+def parse_pair(text: str) -> tuple[str, str, float]:
+    """Return the currencies and the amount named in a prompt, USD to EUR by default."""
+    currencies = CURRENCY_PATTERN.findall(text.upper())
+    amounts = AMOUNT_PATTERN.findall(text)
+    currency_from = currencies[0] if currencies else "USD"
+    currency_to = currencies[1] if len(currencies) > 1 else "EUR"
+
+    return currency_from, currency_to, float(amounts[0]) if amounts else 1.0
+
+
+def script_reply(body: dict[str, Any]) -> dict[str, Any]:
+    """Return the assistant message a ReAct agent expects at this point of the conversation.
+
+    The first turn calls a tool for the user prompt, the turn after a tool
+    result answers in whichever format the request asks for: the respond
+    tool, a JSON schema, the legacy structured-output tool or plain text.
+    """
+    messages = body.get("messages", [])
+    tools = [tool["function"]["name"] for tool in body.get("tools") or []]
+    last = messages[-1] if messages else {"role": "user", "content": ""}
+    user_prompt = next(
+        (str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"),
+        "",
+    )
+    currency_from, currency_to, amount = parse_pair(user_prompt)
+    answer = f"{amount:g} {currency_from} is {amount * EUR_RATES[currency_to] / EUR_RATES[currency_from]:.2f} {currency_to}."
+
+    # Structured-output call of the legacy response format
+    if tools == ["ResponseFormat"]:
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [tool_call("ResponseFormat", {"status": "completed", "message": answer})],
+        }
+
+    if last.get("role") == "user":
+        trade = any(word in user_prompt.lower() for word in ("convert", "trade", "buy", "sell"))
+        if trade and "invoke_currency_exchange_agent" in tools:
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    tool_call("invoke_currency_exchange_agent", {"task_description": user_prompt})
+                ],
+            }
+        if "get_currency_exchange_rate" in tools:
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    tool_call(
+                        "get_currency_exchange_rate",
+                        {"currency_from": currency_from, "currency_to": currency_to},
+                    )
+                ],
+            }
+
+    if "respond" in tools:
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [tool_call("respond", {"status": "completed", "message": answer})],
+        }
+    if body.get("response_format"):
+        return {"role": "assistant", "content": json.dumps({"status": "completed", "message": answer})}
+
+    return {"role": "assistant", "content": answer}
+
+
+def create_llm_app(latency: Latency) -> Starlette:
+    """Create the fake OpenAI-compatible chat completions API."""
+    calls = {"count": 0}
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await latency.sleep()
+        calls["count"] += 1
+
+        message = script_reply(body)
+        prompt_tokens = count_tokens(json.dumps(body.get("messages", [])))
+        completion_tokens = count_tokens(json.dumps(message))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        model = body.get("model", "fake")
+
+        if not body.get("stream"):
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": usage,
+                }
+            )
+
+        def chunk(choices: list[dict[str, Any]], **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            delta = {"role": "assistant", "content": message.get("content")}
+            if message.get("tool_calls"):
+                delta["tool_calls"] = [
+                    {"index": i, **call} for i, call in enumerate(message["tool_calls"])
+                ]
+            yield chunk([{"index": 0, "delta": delta, "finish_reason": None}])
+            yield chunk([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield chunk([], usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def stats(_: Request):
+        return JSONResponse(calls)
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/chat/completions", chat_completions, methods=["POST"]),
+            Route("/stats", stats),
+        ]
+    )
+
+
+# Fake Identity Service issuer and verifier
+
+
+def issue_token(subject: str, ttl: float = 3600.0) -> str:
+    """Return a JWT-shaped access token with an "exp" claim, signed by nobody."""
+
+    def encode(data: dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    header = encode({"alg": "none", "typ": "JWT"})
+    payload = encode({"sub": subject, "exp": int(time.time() + ttl), "jti": uuid4().hex})
+
+    return f"{header}.{payload}.{TOKEN_PREFIX}"
+
+
+def verify_token(access_token: str) -> bool:
+    """Return whether the token was issued by issue_token and has not expired."""
+    # pylint: disable=broad-exception-caught
+    try:
+        _, payload, signature = access_token.split(".")
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except Exception:
+        return False
+
+    return signature == TOKEN_PREFIX and claims.get("exp", 0) > time.time()
+
+
+def create_identity_app(latency: Latency) -> Starlette:
+    """Create the fake Identity Service issuing and verifying access tokens."""
+    calls = {"issued": 0, "verified": 0, "denied": 0}
+
+    async def issue(request: Request):
+        body = await request.json()
+        await latency.sleep()
+        calls["issued"] += 1
+
+        return JSONResponse({"access_token": issue_token(body.get("subject") or "benchmark")})
+
+    async def verify(request: Request):
+        body = await request.json()
+        await latency.sleep()
+        if not verify_token(body.get("access_token", "")):
+            calls["denied"] += 1
+            return JSONResponse({"error": "invalid access token"}, status_code=403)
+
+        calls["verified"] += 1
+        return JSONResponse({"ok": True})
+
+    async def stats(_: Request):
+        return JSONResponse(calls)
+
+    return Starlette(
+        routes=[
+            Route("/issue", issue, methods=["POST"]),
+            Route("/verify", verify, methods=["POST"]),
+            Route("/stats", stats),
+        ]
+    )
+
+
+# Fake frankfurter exchange rate API
+
+
+def rate_table(base: str, day: date) -> dict[str, float]:
+    """Return the rates of a base currency on a day, drifting slightly from day to day."""
+    drift = 1.0 + ((day.toordinal() % 17) - 8) / 1000
+    base_rate = EUR_RATES[base]
+
+    return {
+        currency: round(rate * drift / base_rate, 6) if currency != "EUR" else round(1.0 / base_rate, 6)
+        for currency, rate in EUR_RATES.items()
+        if currency != base
+    }
+
+
+def business_day(day: date) -> date:
+    """Return the day, or the previous Friday for a weekend day."""
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def create_frankfurter_app(latency: Latency) -> Starlette:
+    """Create the fake exchange rate API serving the latest, historical and time series endpoints."""
+    calls = {"count": 0}
+
+    async def rates(request: Request):
+        await latency.sleep()
+        calls["count"] += 1
+
+        base = request.query_params.get("from", "EUR").upper()
+        if base not in EUR_RATES:
+            return JSONResponse({"message": "not found"}, status_code=404)
+
+        path = request.path_params["path"]
+        try:
+            if ".." in path:
+                start, _, end = path.partition("..")
+                start_day = date.fromisoformat(start)
+                end_day = date.fromisoformat(end) if end else date.today()
+                days = [
+                    start_day + timedelta(days=i)
+                    for i in range((end_day - start_day).days + 1)
+                ]
+                return JSONResponse(
+                    {
+                        "amount": 1.0,
+                        "base": base,
+                        "start_date": start_day.isoformat(),
+                        "end_date": end_day.isoformat(),
+                        "rates": {
+                            d.isoformat(): rate_table(base, d) for d in days if d.weekday() < 5
+                        },
+                    }
+                )
+
+            day = business_day(date.today() if path == "latest" else date.fromisoformat(path))
+        except ValueError:
+            return JSONResponse({"message": "not found"}, status_code=404)
+
+        return JSONResponse(
+            {"amount": 1.0, "base": base, "date": day.isoformat(), "rates": rate_table(base, day)}
+        )
+
+    async def stats(_: Request):
+        return JSONResponse(calls)
+
+    return Starlette(
+        routes=[
+            Route("/stats", stats),
+            Route("/{path:path}", rates),
+        ]
+    )
+
+
+class Server(uvicorn.Server):
+    """Server leaving the stop signals to serve(), which stops every server at once."""
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        # Each server would replace the handler of the previous one, then
+        # re-raise the signal once stopped
+        yield
+
+
+async def serve(apps: dict[int, Starlette]) -> None:
+    """Serve the apps on their ports until SIGINT or SIGTERM."""
+    servers = [
+        Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        for port, app in apps.items()
+    ]
+
+    def stop() -> None:
+        for server in servers:
+            server.should_exit = True
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    """Main function to serve the fakes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-port", type=int, default=8000)
+    parser.add_argument("--identity-port", type=int, default=8001)
+    parser.add_argument("--frankfurter-port", type=int, default=8002)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per LLM call.")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="Extra random seconds per LLM call.")
+    parser.add_argument("--identity-latency", type=float, default=0.02, help="Seconds per token issue or check.")
+    parser.add_argument("--frankfurter-latency", type=float, default=0.05, help="Seconds per rate lookup.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the latency jitter.")
+    args = parser.parse_args()
+
+    asyncio.run(
+        serve(
+            {
+                args.llm_port: create_llm_app(Latency(args.llm_latency, args.llm_jitter, args.seed)),
+                args.identity_port: create_identity_app(Latency(args.identity_latency)),
+                args.frankfurter_port: create_frankfurter_app(Latency(args.frankfurter_latency)),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,778 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Offline load test of the MCP server, the currency agent and the financial assistant.
+
+Starts the fake LLM, Identity Service and exchange rate API of fakes.py, then
+the three services against them, and drives the stack with a concurrent
+workload: a closed loop of users or an open loop of Poisson arrivals, mixing
+rate lookups and conversions sent to the financial assistant with multi-turn
+sessions sent to the currency agent over A2A.
+
+Reports the throughput and the p50/p95/p99 latencies per scenario, and a
+per-hop breakdown built from the spans the services export. The results can
+be written as JSON and compared with the results of a baseline run.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import secrets
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from fakes import EUR_RATES, issue_token
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Directory, import string and whether the app is a factory, in start order
+SERVICES = {
+    "mcp": ("mcp/currency_exchange", "main:app", False),
+    "currency_agent": ("agent/a2a/currency_exchange", "main:create_app", True),
+    "financial_assistant": ("agent/oasf/financial_assistant", "main:create_app", True),
+}
+FAKES = ("llm", "identity", "frankfurter")
+
+SCENARIOS = ("rate", "convert", "session")
+
+SESSION_PROMPTS = (
+    "What is the exchange rate between {a} and {b}?",
+    "And how much is {amount} {a} in {c}?",
+    "Thanks, what was it on 2025-01-02?",
+)
+
+# Spans of the ASGI instrumentation around each message, noise in the breakdown
+IGNORED_SPAN_SUFFIXES = (" http send", " http receive")
+
+# Counters of the stats() components read from /metrics, and the ones counting as hits
+COMPONENTS = {
+    "fast_path": (("hits", "misses", "errors"), ("hits", "errors")),
+    "llm_cache": (("hits", "semantic_hits", "misses"), ("hits", "semantic_hits")),
+}
+
+
+@dataclass
+class Sample:
+    """One request of the workload."""
+
+    scenario: str
+    start: float
+    latency: float
+    ok: bool
+    trace_id: str
+    status: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class Workload:
+    """Sends the requests of the scenarios and records their samples."""
+
+    client: httpx.AsyncClient
+    urls: dict[str, str]
+    mix: dict[str, float]
+    session_turns: int
+    rng: random.Random
+    samples: list[Sample] = field(default_factory=list)
+
+    def pick(self) -> str:
+        """Return a scenario drawn from the mix."""
+        return self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    def currencies(self) -> tuple[str, str, str, int]:
+        """Return three distinct currencies and an amount."""
+        a, b, c = self.rng.sample(sorted(EUR_RATES), 3)
+        return a, b, c, self.rng.choice((10, 100, 250, 1020))
+
+    async def run(self, scenario: str) -> None:
+        """Run one scenario, recording a sample per request."""
+        a, b, c, amount = self.currencies()
+
+        if scenario == "rate":
+            await self._invoke(scenario, f"What is the exchange rate between {a} and {b}?")
+        elif scenario == "convert":
+            await self._invoke(scenario, f"Convert {amount} {a} to {b}")
+        else:
+            await self._session(a, b, c, amount)
+
+    async def _request(self, scenario: str, send) -> Any:
+        """Send a request with a fresh sampled trace, recording its sample.
+
+        The send function returns the result and the status of the answer.
+        """
+        trace_id = secrets.token_hex(16)
+        headers = {"traceparent": f"00-{trace_id}-{secrets.token_hex(8)}-01"}
+        start = time.perf_counter()
+        # pylint: disable=broad-exception-caught
+        try:
+            result, status = await send(headers)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+            self.samples.append(
+                Sample(scenario, start, time.perf_counter() - start, False, trace_id, error)
+            )
+            return None
+
+        self.samples.append(
+            Sample(scenario, start, time.perf_counter() - start, True, trace_id, status)
+        )
+        return result
+
+    async def _invoke(self, scenario: str, prompt: str) -> None:
+        """Send a prompt to the financial assistant."""
+
+        async def send(headers):
+            response = await self.client.post(
+                f"{self.urls['financial_assistant']}/invoke",
+                json={"prompt": prompt},
+                headers=headers,
+            )
+            response.raise_for_status()
+            answer = response.json().get("answer")
+
+            return answer, "completed" if answer else "no_answer"
+
+        await self._request(scenario, send)
+
+    async def _session(self, a: str, b: str, c: str, amount: int) -> None:
+        """Hold a multi-turn conversation with the currency agent in one context."""
+        context_id = uuid4().hex
+        task_id = None
+        access_token = issue_token("benchmark")
+
+        for turn in range(self.session_turns):
+            prompt = SESSION_PROMPTS[turn % len(SESSION_PROMPTS)].format(
+                a=a, b=b, c=c, amount=amount
+            )
+            message = {
+                "kind": "message",
+                "role": "user",
+                "messageId": uuid4().hex,
+                "contextId": context_id,
+                "parts": [{"kind": "text", "text": prompt}],
+            }
+            if task_id:
+                message["taskId"] = task_id
+
+            async def send(headers, message=message):
+                response = await self.client.post(
+                    f"{self.urls['currency_agent']}/",
+                    json={
+                        "jsonrpc": "2.0",
+                        "id": uuid4().hex,
+                        "method": "message/send",
+                        "params": {"message": message},
+                    },
+                    headers={**headers, "Authorization": f"Bearer {access_token}"},
+                )
+                response.raise_for_status()
+                body = response.json()
+                if "error" in body:
+                    raise RuntimeError(body["error"].get("message", body["error"]))
+
+                result = body["result"]
+                state = result.get("status", {}).get("state")
+                if state in ("failed", "rejected", "canceled"):
+                    raise RuntimeError(f"Task {state}")
+
+                return result, state
+
+            result = await self._request("session", send)
+            if result is None:
+                return
+            # An unfinished task continues with the next turn, a finished one starts a new task
+            task_id = (
+                result.get("id")
+                if result.get("status", {}).get("state") == "input-required"
+                else None
+            )
+
+
+async def closed_loop(workload: Workload, concurrency: int, stop_at: float) -> None:
+    """Run users sending their next scenario as soon as the previous one is done."""
+    loop = asyncio.get_running_loop()
+
+    async def user():
+        while loop.time() < stop_at:
+            await workload.run(workload.pick())
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def open_loop(workload: Workload, rate: float, stop_at: float) -> None:
+    """Start scenarios at Poisson arrivals, whether the previous ones are done or not."""
+    loop = asyncio.get_running_loop()
+    tasks = set()
+
+    while loop.time() < stop_at:
+        task = asyncio.create_task(workload.run(workload.pick()))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        await asyncio.sleep(workload.rng.expovariate(rate))
+
+    await asyncio.gather(*tasks)
+
+
+# Statistics
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q-quantile of the values, interpolated between the closest ranks."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """Return the count, mean, p50, p95, p99 and max of latencies, in milliseconds."""
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "max": max(latencies, default=0.0) * 1000,
+    }
+
+
+def summarize_samples(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    """Return the throughput, errors, answer statuses and latencies of the samples."""
+    ok = [sample.latency for sample in samples if sample.ok]
+    errors = defaultdict(int)
+    statuses = defaultdict(int)
+    for sample in samples:
+        if sample.ok:
+            statuses[sample.status] += 1
+        else:
+            errors[sample.error] += 1
+
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "throughput": len(ok) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": summarize(ok),
+        "statuses": dict(sorted(statuses.items())),
+        "completed_ratio": statuses["completed"] / len(ok) if ok else 0.0,
+        "error_messages": dict(sorted(errors.items(), key=lambda e: -e[1])[:5]),
+    }
+
+
+def read_components(metrics: str) -> dict[str, dict[str, float]]:
+    """Return the counters of the stats() components exposed in a /metrics scrape."""
+    names = {
+        f"{component}_{counter}": (component, counter)
+        for component, (counters, _) in COMPONENTS.items()
+        for counter in counters
+    }
+    components = defaultdict(dict)
+    for family in text_string_to_metric_families(metrics):
+        if family.name in names:
+            component, counter = names[family.name]
+            components[component][counter] = sum(sample.value for sample in family.samples)
+
+    return dict(components)
+
+
+def component_deltas(
+    before: dict[str, dict[str, dict[str, float]]],
+    after: dict[str, dict[str, dict[str, float]]],
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Return the counters of each service component over the measured run, and its hit ratio."""
+    result = {}
+    for service, components in after.items():
+        for component, counters in components.items():
+            previous = before.get(service, {}).get(component, {})
+            delta = {name: value - previous.get(name, 0.0) for name, value in counters.items()}
+            total = sum(delta.values())
+            hits = sum(delta.get(name, 0.0) for name in COMPONENTS[component][1])
+            delta["hit_ratio"] = hits / total if total else 0.0
+            result.setdefault(service, {})[component] = delta
+
+    return result
+
+
+def hop_label(span: dict[str, Any], peers: dict[int, str]) -> str:
+    """Return the hop of a span: the peer called by a client span, else the span name."""
+    service = span.get("resource", {}).get("attributes", {}).get("service.name", "unknown")
+    attributes = span.get("attributes", {})
+
+    if span.get("kind") == "SpanKind.CLIENT":
+        url = attributes.get("url.full") or attributes.get("http.url")
+        port = attributes.get("server.port") or (urlsplit(url).port if url else None)
+        if port in peers:
+            return f"{service} -> {peers[port]}"
+
+    return f"{service} {span.get('name')}"
+
+
+def read_spans(paths: list[Path]) -> list[dict[str, Any]]:
+    """Return the spans of the JSON-lines span files."""
+    spans = []
+    for path in paths:
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                spans.extend(json.loads(line) for line in f if line.strip())
+    return spans
+
+
+def breakdown(
+    spans: list[dict[str, Any]],
+    scenarios: dict[str, str],
+    peers: dict[int, str],
+) -> dict[str, dict[str, Any]]:
+    """Return the latencies of each hop per scenario, for the traces of the measured requests.
+
+    Args:
+        spans: The exported spans.
+        scenarios: The scenario of each measured trace id.
+        peers: The name of the service or fake listening on each port.
+    """
+    durations = defaultdict(lambda: defaultdict(list))
+    for span in spans:
+        name = span.get("name", "")
+        if name.endswith(IGNORED_SPAN_SUFFIXES):
+            continue
+        scenario = scenarios.get(span.get("context", {}).get("trace_id", "").removeprefix("0x"))
+        if scenario is None:
+            continue
+
+        duration = (
+            datetime.fromisoformat(span["end_time"]) - datetime.fromisoformat(span["start_time"])
+        ).total_seconds()
+        durations[scenario][hop_label(span, peers)].append(duration)
+
+    requests = defaultdict(int)
+    for scenario in scenarios.values():
+        requests[scenario] += 1
+
+    result = {}
+    for scenario, hops in sorted(durations.items()):
+        result[scenario] = {
+            label: {
+                **summarize(values),
+                "per_request": len(values) / requests[scenario],
+                "total_per_request_ms": sum(values) / requests[scenario] * 1000,
+            }
+            for label, values in sorted(hops.items(), key=lambda h: -sum(h[1]))
+        }
+    return result
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    max_regression: float,
+) -> list[str]:
+    """Print the changes from the baseline and return the regressions above the threshold."""
+    regressions = []
+    print(f"\n{'vs baseline':<24}{'throughput':>14}{'p50':>12}{'p95':>12}{'p99':>12}")
+
+    for scope, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scope)
+        if not previous:
+            continue
+
+        line = f"{scope:<24}"
+        # Higher is better for the throughput, lower for the latencies
+        change = _change(current["throughput"], previous["throughput"])
+        line += f"{change:>+13.1%} "
+        if -change > max_regression:
+            regressions.append(f"{scope} throughput {change:+.1%}")
+
+        for key in ("p50", "p95", "p99"):
+            change = _change(current["latency_ms"][key], previous["latency_ms"][key])
+            line += f"{change:>+11.1%} "
+            if change > max_regression:
+                regressions.append(f"{scope} {key} {change:+.1%}")
+        print(line)
+
+        # Requests answered without an error, but not completed, such as a broken tool call
+        change = _change(current["completed_ratio"], previous.get("completed_ratio", 0.0))
+        if -change > max_regression:
+            regressions.append(f"{scope} completed ratio {change:+.1%}")
+
+    for service, components in results["components"].items():
+        for component, counters in components.items():
+            previous = baseline.get("components", {}).get(service, {}).get(component)
+            if not previous:
+                continue
+
+            change = _change(counters["hit_ratio"], previous["hit_ratio"])
+            print(f"{service + ' ' + component + ' hit ratio':<40}{change:>+11.1%}")
+            if -change > max_regression:
+                regressions.append(f"{service} {component} hit ratio {change:+.1%}")
+
+    return regressions
+
+
+def _change(current: float, previous: float) -> float:
+    return (current - previous) / previous if previous else 0.0
+
+
+def report(results: dict[str, Any]) -> None:
+    """Print the results."""
+    print(f"\n{'scenario':<24}{'requests':>10}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for scope, summary in results["scenarios"].items():
+        latency = summary["latency_ms"]
+        print(
+            f"{scope:<24}{summary['requests']:>10}{summary['errors']:>8}"
+            f"{summary['throughput']:>9.2f}{latency['p50']:>10.1f}"
+            f"{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+        )
+        print(
+            "    answers: "
+            + ", ".join(f"{count} {status}" for status, count in summary["statuses"].items())
+        )
+        for error, count in summary["error_messages"].items():
+            print(f"    {count} x {error}")
+
+    for service, components in results["components"].items():
+        for component, counters in components.items():
+            print(
+                f"\n{service} {component}: "
+                + ", ".join(f"{name} {value:g}" for name, value in counters.items() if name != "hit_ratio")
+                + f", hit ratio {counters['hit_ratio']:.1%}"
+            )
+
+    for scenario, hops in results["hops"].items():
+        print(f"\n{scenario} hops{'':<51}{'calls/req':>10}{'p50 ms':>10}{'p95 ms':>10}{'ms/req':>10}")
+        for label, hop in hops.items():
+            print(
+                f"  {label:<64.64}{hop['per_request']:>10.2f}{hop['p50']:>10.1f}"
+                f"{hop['p95']:>10.1f}{hop['total_per_request_ms']:>10.1f}"
+            )
+
+    if results["upstream_calls"]:
+        print("\nupstream calls per request: " + ", ".join(
+            f"{name} {calls:.2f}" for name, calls in results["upstream_calls"].items()
+        ))
+
+
+# Processes
+
+
+def free_port() -> int:
+    """Return a port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Stack:
+    """The fakes and the three services, each in its own process."""
+
+    def __init__(self, args: argparse.Namespace, workdir: Path) -> None:
+        self.args = args
+        self.workdir = workdir
+        self.ports = {name: free_port() for name in (*FAKES, *SERVICES)}
+        self.urls = {name: f"http://127.0.0.1:{port}" for name, port in self.ports.items()}
+        self.processes: list[subprocess.Popen] = []
+
+    @property
+    def peers(self) -> dict[int, str]:
+        """Return the name of the service or fake listening on each port."""
+        return {port: name for name, port in self.ports.items()}
+
+    def span_files(self) -> list[Path]:
+        """Return the span files of the services."""
+        return [self.workdir / f"spans-{name}.jsonl" for name in SERVICES]
+
+    def environment(self, name: str) -> dict[str, str]:
+        """Return the environment of a service, pointing it at the fakes and its peers."""
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key != "PROMETHEUS_MULTIPROC_DIR"
+        }
+        env.update(
+            {
+                "PORT": str(self.ports[name]),
+                "HOST": "127.0.0.1",
+                "LOG_LEVEL": "WARNING",
+                "IDENTITY_SERVICE_API_KEY": "benchmark",
+                "BENCHMARK_IDENTITY_URL": self.urls["identity"],
+                "AZURE_OPENAI_ENDPOINT": f"{self.urls['llm']}/v1",
+                "AZURE_OPENAI_API_KEY": "benchmark",
+                "FRANKFURTER_API_URL": self.urls["frankfurter"],
+                "RATE_STORE_PATH": str(self.workdir / "rate_store"),
+                "CURRENCY_EXCHANGE_MCP_SERVER_URL": f"{self.urls['mcp']}/mcp",
+                "CURRENCY_EXCHANGE_AGENT_URL": self.urls["currency_agent"],
+                "AGENT_URL": f"{self.urls['currency_agent']}/",
+                "CHECKPOINTER_URL": f"sqlite:///{self.workdir / 'checkpoints.db'}",
+                "TASK_STORE_URL": f"sqlite:///{self.workdir / 'tasks.db'}",
+                # Every request reaches the LLM unless the caches are enabled with --env
+                "LLM_CACHE_MAX_SIZE": "0",
+                "TRACING_EXPORTER": (
+                    f"file:{self.workdir / f'spans-{name}.jsonl'}"
+                    if self.args.trace_sample_ratio > 0
+                    else "none"
+                ),
+                "TRACING_SAMPLE_RATIO": str(self.args.trace_sample_ratio),
+            }
+        )
+        env.update(dict(item.split("=", 1) for item in self.args.env))
+
+        return env
+
+    def _spawn(self, name: str, command: list[str], env: dict[str, str] | None = None) -> None:
+        log = (self.workdir / f"{name}.log").open("w", encoding="utf-8")
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command,
+            cwd=Path(__file__).parent,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        self.processes.append(process)
+        self._wait_ready(name, process, "/stats" if name in FAKES else "/metrics")
+
+    def _wait_ready(self, name: str, process: subprocess.Popen, path: str) -> None:
+        deadline = time.monotonic() + self.args.startup_timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{name} exited, see {self.workdir / f'{name}.log'}")
+            try:
+                if httpx.get(f"{self.urls[name]}{path}", timeout=1).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+
+        raise RuntimeError(f"{name} did not start, see {self.workdir / f'{name}.log'}")
+
+    def start(self) -> None:
+        """Start the fakes, then the services in dependency order."""
+        args = self.args
+        self._spawn(
+            "llm",
+            [
+                sys.executable, "fakes.py",
+                "--llm-port", str(self.ports["llm"]),
+                "--identity-port", str(self.ports["identity"]),
+                "--frankfurter-port", str(self.ports["frankfurter"]),
+                "--llm-latency", str(args.llm_latency),
+                "--llm-jitter", str(args.llm_jitter),
+                "--identity-latency", str(args.identity_latency),
+                "--frankfurter-latency", str(args.frankfurter_latency),
+                "--seed", str(args.seed),
+            ],
+        )
+
+        for name, (directory, app, factory) in SERVICES.items():
+            command = [
+                sys.executable, "run_service.py", str(ROOT / directory), app,
+                "--port", str(self.ports[name]),
+            ]
+            if factory:
+                command.append("--factory")
+            self._spawn(name, command, self.environment(name))
+
+    def stop(self) -> None:
+        """Stop the processes gracefully, so the services flush their spans."""
+        for process in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+        for process in reversed(self.processes):
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def fake_stats(self) -> dict[str, int]:
+        """Return the calls counted by the fakes so far."""
+        stats = {}
+        for name in FAKES:
+            for key, value in httpx.get(f"{self.urls[name]}/stats", timeout=5).json().items():
+                stats[f"{name}.{key}"] = value
+        return stats
+
+    def component_stats(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Return the fast path and LLM cache counters of the agents so far."""
+        return {
+            name: read_components(httpx.get(f"{self.urls[name]}/metrics", timeout=5).text)
+            for name in ("currency_agent", "financial_assistant")
+        }
+
+
+async def drive(args: argparse.Namespace, stack: Stack) -> tuple[dict[str, Any], dict[str, str]]:
+    """Run the warmup and the measured workload.
+
+    Returns the results and the scenario of each measured trace id.
+    """
+    mix = {
+        name: float(weight)
+        for name, weight in (item.split("=") for item in args.mix.split(","))
+    }
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios {', '.join(unknown)}, expected {', '.join(SCENARIOS)}")
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        limits=limits, timeout=args.request_timeout, trust_env=False
+    ) as client:
+        workload = Workload(client, stack.urls, mix, args.session_turns, random.Random(args.seed))
+        loop = asyncio.get_running_loop()
+
+        async def run(duration: float) -> None:
+            stop_at = loop.time() + duration
+            if args.mode == "closed":
+                await closed_loop(workload, args.concurrency, stop_at)
+            else:
+                await open_loop(workload, args.rate, stop_at)
+
+        if args.warmup > 0:
+            await run(args.warmup)
+        workload.samples.clear()
+        calls_before = stack.fake_stats()
+        components_before = stack.component_stats()
+
+        start = time.perf_counter()
+        await run(args.duration)
+        elapsed = time.perf_counter() - start
+
+        calls_after = stack.fake_stats()
+        components_after = stack.component_stats()
+
+    samples = workload.samples
+    scenarios = {"all": summarize_samples(samples, elapsed)}
+    for scenario in mix:
+        scenarios[scenario] = summarize_samples(
+            [sample for sample in samples if sample.scenario == scenario], elapsed
+        )
+
+    results = {
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("output", "compare")
+        },
+        "elapsed": elapsed,
+        "scenarios": scenarios,
+        "components": component_deltas(components_before, components_after),
+        "upstream_calls": {
+            name: (calls_after[name] - calls_before.get(name, 0)) / max(1, len(samples))
+            for name in calls_after
+        },
+        "samples": [asdict(sample) for sample in samples] if args.samples else [],
+    }
+
+    return results, {sample.trace_id: sample.scenario for sample in samples}
+
+
+def main() -> None:
+    """Main function to run the load test."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    workload = parser.add_argument_group("workload")
+    workload.add_argument("--mode", choices=("closed", "open"), default="closed")
+    workload.add_argument("--concurrency", type=int, default=8, help="Users of the closed loop.")
+    workload.add_argument("--rate", type=float, default=4.0, help="Arrivals per second of the open loop.")
+    workload.add_argument("--duration", type=float, default=30.0, help="Seconds measured.")
+    workload.add_argument("--warmup", type=float, default=5.0, help="Seconds run before measuring.")
+    workload.add_argument(
+        "--mix",
+        default="rate=0.5,convert=0.3,session=0.2",
+        help=f"Weights of the scenarios, among {', '.join(SCENARIOS)}.",
+    )
+    workload.add_argument("--session-turns", type=int, default=3, help="Turns of a session.")
+    workload.add_argument("--request-timeout", type=float, default=120.0)
+    workload.add_argument("--seed", type=int, default=0)
+
+    fakes = parser.add_argument_group("fakes")
+    fakes.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per LLM call.")
+    fakes.add_argument("--llm-jitter", type=float, default=0.05, help="Extra random seconds per LLM call.")
+    fakes.add_argument("--identity-latency", type=float, default=0.02, help="Seconds per token issue or check.")
+    fakes.add_argument("--frankfurter-latency", type=float, default=0.05, help="Seconds per rate lookup.")
+
+    services = parser.add_argument_group("services")
+    services.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Environment variable of the services, such as LLM_CACHE_MAX_SIZE=1024.",
+    )
+    services.add_argument(
+        "--trace-sample-ratio",
+        type=float,
+        default=1.0,
+        help="Ratio of the requests traced for the per-hop breakdown, 0 disables tracing.",
+    )
+    services.add_argument("--startup-timeout", type=float, default=60.0)
+    services.add_argument("--workdir", help="Directory of the logs, spans and stores, kept after the run.")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", help="Path of the JSON results.")
+    output.add_argument("--samples", action="store_true", help="Include every request in the JSON results.")
+    output.add_argument("--compare", help="Path of the JSON results of a baseline run.")
+    output.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.1,
+        help="Relative change from the baseline reported as a regression.",
+    )
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="loadtest-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    stack = Stack(args, workdir)
+    try:
+        stack.start()
+        results, traces = asyncio.run(drive(args, stack))
+    finally:
+        stack.stop()
+
+    # The spans are flushed once the services have stopped
+    results["hops"] = (
+        breakdown(read_spans(stack.span_files()), traces, stack.peers)
+        if args.trace_sample_ratio > 0
+        else {}
+    )
+
+    report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+    if args.workdir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
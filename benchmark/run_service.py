@@ -0,0 +1,66 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Run one of the sample services against the fake Identity Service.
+
+The Identity Service SDK is patched before the service is imported, so the
+service issues and verifies its access tokens with the fake issuer of
+fakes.py instead of the real Identity Service. Everything else runs unchanged.
+"""
+
+import argparse
+import os
+import sys
+
+import httpx
+import uvicorn
+from identityservice.sdk import IdentityServiceSdk
+
+IDENTITY_URL = os.getenv("BENCHMARK_IDENTITY_URL", "http://127.0.0.1:8001")
+
+_client = httpx.Client(base_url=IDENTITY_URL, timeout=10)
+
+
+def access_token(_self, agentic_service_id: str | None = None, *_, **__) -> str:
+    """Issue an access token with the fake issuer."""
+    response = _client.post("/issue", json={"subject": agentic_service_id})
+    response.raise_for_status()
+
+    return response.json()["access_token"]
+
+
+def authorize(_self, access_token: str, tool_name: str | None = None, *_, **__) -> None:
+    """Verify an access token with the fake verifier, raising if it is denied."""
+    response = _client.post("/verify", json={"access_token": access_token, "tool_name": tool_name})
+    if response.status_code == 403:
+        raise PermissionError(f"access denied for {tool_name}")
+    response.raise_for_status()
+
+
+def main() -> None:
+    """Main function to run the service."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("service_dir", help="Directory of the service, such as mcp/currency_exchange.")
+    parser.add_argument("app", help="Import string of the app, such as main:app.")
+    parser.add_argument("--factory", action="store_true", help="The app is an app factory.")
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+
+    IdentityServiceSdk.access_token = access_token
+    IdentityServiceSdk.authorize = authorize
+
+    # The services import their modules by their plain names
+    service_dir = os.path.abspath(args.service_dir)
+    sys.path.insert(0, service_dir)
+    os.chdir(service_dir)
+
+    uvicorn.run(
+        args.app,
+        factory=args.factory,
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
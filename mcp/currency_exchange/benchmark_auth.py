@@ -0,0 +1,120 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark of the per-request authentication overhead of the MCP middleware.
+
+Compares IdentityServiceMCPMiddleware, which authorizes every request with the
+Identity Service, with MCPAuthMiddleware, which caches verification results.
+The Identity Service is replaced by a stub with a configurable latency, so the
+benchmark runs offline.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+from identityservice.auth.starlette import IdentityServiceMCPMiddleware
+from identityservice.sdk import IdentityServiceSdk
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from middleware import MCPAuthMiddleware
+
+os.environ.setdefault("IDENTITY_SERVICE_API_KEY", "benchmark")
+
+TOOL_CALL = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "tools/call",
+    "params": {"name": "get_currency_exchange_rate", "arguments": {}},
+}
+
+
+def stub_authorize(latency: float):
+    """Return a stub of the Identity Service authorization taking the given latency."""
+
+    def authorize(_self, access_token: str, tool_name: str | None = None):
+        time.sleep(latency)
+        if access_token == "invalid":
+            raise RuntimeError(f"access denied for {tool_name}")
+
+    return authorize
+
+
+async def endpoint(_):
+    """Respond without doing any work so only the middleware is measured."""
+    return JSONResponse({"jsonrpc": "2.0", "id": 1, "result": {}})
+
+
+async def run(middleware: Middleware, requests: int, concurrency: int, tokens: int):
+    """Send tool calls through the middleware and return the request latencies."""
+    app = Starlette(routes=[Route("/mcp", endpoint, methods=["POST"])], middleware=[middleware])
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+
+        async def call(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/mcp",
+                    json=TOOL_CALL,
+                    headers={"Authorization": f"Bearer token-{i % tokens}"},
+                )
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return latencies, elapsed
+
+
+def report(name: str, latencies: list[float], elapsed: float):
+    """Print the latency summary of a run."""
+    latencies = sorted(latencies)
+    print(
+        f"{name:<32} "
+        f"mean {statistics.mean(latencies) * 1000:8.3f} ms  "
+        f"p50 {latencies[len(latencies) // 2] * 1000:8.3f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.3f} ms  "
+        f"{len(latencies) / elapsed:8.1f} req/s"
+    )
+
+
+async def main() -> None:
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=16, help="Distinct bearer tokens.")
+    parser.add_argument(
+        "--auth-latency",
+        type=float,
+        default=0.005,
+        help="Seconds taken by the stub Identity Service authorization.",
+    )
+    args = parser.parse_args()
+
+    IdentityServiceSdk.authorize = stub_authorize(args.auth_latency)
+
+    for name, middleware in (
+        ("IdentityServiceMCPMiddleware", Middleware(IdentityServiceMCPMiddleware)),
+        ("MCPAuthMiddleware (cached)", Middleware(MCPAuthMiddleware)),
+    ):
+        latencies, elapsed = await run(
+            middleware, args.requests, args.concurrency, args.tokens
+        )
+        report(name, latencies, elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,25 +2,299 @@
 # SPDX-License-Identifier: Apache-2.0
 """MCP Server Example."""
 
+import argparse
+import asyncio
+import functools
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
 
 import httpx
+import numpy as np
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from identityservice.auth.starlette import IdentityServiceMCPMiddleware
 from mcp.server.fastmcp import FastMCP
+from opentelemetry import trace
+from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+from pydantic import BaseModel
+
+from metrics import (MCP_TOOL_DURATION, UPSTREAM_REQUEST_DURATION,
+                     UPSTREAM_REQUEST_ERRORS, MetricsMiddleware,
+                     metrics_endpoint, stats_collector)
+from middleware import MCPAuthMiddleware
+from rate_cache import RateCache
+from rate_series import Interval, summarize_series
+from rate_store import HistoricalRateStore
+from tracing import setup_tracing, shutdown_tracing
 
 load_dotenv()
 
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "DEBUG").upper())
+logger = logging.getLogger(__name__)
+
+# Upstream requests to the exchange rate API are traced by the httpx instrumentation
+setup_tracing("currency-exchange-mcp")
+tracer = trace.get_tracer(__name__)
 
 mcp = FastMCP("GitHub", stateless_http=True)
 
+FRANKFURTER_API_URL = os.getenv("FRANKFURTER_API_URL", "https://api.frankfurter.app")
+
+# Currency whose rate tables are fetched upstream, all other pairs are cross rates
+PIVOT_CURRENCY = os.getenv("RATE_PIVOT_CURRENCY", "EUR")
+
+# Shared upstream client, created and closed by the application lifespan
+http_client: httpx.AsyncClient | None = None
+
+rate_cache = RateCache(
+    max_size=int(os.getenv("RATE_CACHE_MAX_SIZE", "1024")),
+    latest_ttl=float(os.getenv("RATE_CACHE_LATEST_TTL", "60")),
+)
+stats_collector.register("rate_cache", rate_cache.stats)
+
+
+# Past rates never change, so they are persisted in a memory-mapped store
+# shared by every worker process
+RATE_STORE_PATH = os.getenv("RATE_STORE_PATH", "data/rate_store")
+rate_store = (
+    HistoricalRateStore(RATE_STORE_PATH, base=PIVOT_CURRENCY)
+    if RATE_STORE_PATH
+    else None
+)
+
+
+class InvalidResponseError(Exception):
+    """Raised when the exchange rate API returns an unexpected payload."""
+
+
+class RateNotFoundError(Exception):
+    """Raised when no exchange rate is available for a currency."""
+
+    def __init__(self, currency: str):
+        super().__init__(currency)
+        self.currency = currency
+
+
+# pylint: disable=too-few-public-methods
+class ConversionRequest(BaseModel):
+    """A single conversion of a batch."""
+
+    currency_from: str = "USD"
+    currency_to: str = "EUR"
+    amount: float = 1.0
+    currency_date: str = "latest"
+
+
+def error_response(e: BaseException) -> dict:
+    """Return the tool error payload for an exception raised while fetching rates."""
+    if isinstance(e, RateNotFoundError):
+        return {"error": f"Exchange rate for {e.currency} not found."}
+    if isinstance(e, InvalidResponseError):
+        return {"error": "Invalid API response format."}
+    if isinstance(e, httpx.HTTPError):
+        return {"error": f"API request failed: {e}"}
+    if isinstance(e, ValueError):
+        return {"error": "Invalid JSON response from API."}
+
+    logger.error("Unexpected error while fetching rates", exc_info=e)
+    return {"error": "Unexpected error while fetching exchange rates."}
+
+
+def instrumented(tool):
+    """Trace and time the tool, FastMCP reads the signature of the wrapped function."""
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        outcome = "exception"
+        start = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(
+                f"execute_tool {tool.__name__}",
+                attributes={"gen_ai.tool.name": tool.__name__},
+            ):
+                result = await tool(*args, **kwargs)
+            outcome = "error" if isinstance(result, dict) and "error" in result else "ok"
+            return result
+        finally:
+            MCP_TOOL_DURATION.labels(tool.__name__, outcome).observe(
+                time.perf_counter() - start
+            )
+
+    return wrapper
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client used to call the exchange rate API."""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(
+            os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+        ),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv("HTTP_TIMEOUT", "10")),
+        connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    )
+
+    return httpx.AsyncClient(
+        base_url=FRANKFURTER_API_URL,
+        http2=True,
+        limits=limits,
+        timeout=timeout,
+    )
+
+
+async def fetch_rates(path: str, params: dict) -> dict:
+    """Fetch rates from the exchange rate API using the shared client."""
+    if http_client is None:
+        raise RuntimeError("HTTP client not initialized.")
+
+    start = time.perf_counter()
+    try:
+        response = await http_client.get(path, params=params)
+    except httpx.HTTPError as e:
+        UPSTREAM_REQUEST_ERRORS.labels("frankfurter", type(e).__name__).inc()
+        raise
+
+    UPSTREAM_REQUEST_DURATION.labels("frankfurter", str(response.status_code)).observe(
+        time.perf_counter() - start
+    )
+    if response.is_error:
+        UPSTREAM_REQUEST_ERRORS.labels("frankfurter", f"HTTP {response.status_code}").inc()
+    response.raise_for_status()
+
+    return response.json()
+
+
+async def get_rate_table(base: str, currency_date: str) -> dict:
+    """Return the full rate table of a base currency for a date.
+
+    Tables are served from the cache, then from the historical rate store for
+    past dates, and only fetched upstream on a miss of both.
+    """
+    stored_date = None
+    if rate_store is not None and base == rate_store.base:
+        stored_date = rate_store.parse_date(currency_date)
+
+    async def fetch() -> dict:
+        if stored_date is not None:
+            data = rate_store.get(stored_date)
+            if data is not None:
+                return data
+
+        data = await fetch_rates(f"/{currency_date}", params={"from": base})
+        if "rates" not in data:
+            raise InvalidResponseError()
+
+        # Include the base itself so cross rates can be derived from the table
+        data["rates"][data.get("base", base)] = 1.0
+
+        if stored_date is not None:
+            rate_store.put(stored_date, data)
+
+        return data
+
+    return await rate_cache.get_or_fetch(
+        (base, currency_date),
+        rate_cache.ttl_for(currency_date),
+        fetch,
+    )
+
+
+async def get_rates(currency_from: str, currency_to: str, currency_date: str) -> dict:
+    """Return the rates from a currency to one or more comma separated currencies.
+
+    Every rate is derived from the pivot currency table, so a single upstream
+    call per date serves all currency pairs.
+    """
+    table = await get_rate_table(PIVOT_CURRENCY, currency_date)
+    rates = table["rates"]
+
+    currency_from = currency_from.upper()
+    if currency_from not in rates:
+        raise RateNotFoundError(currency_from)
+
+    result = {}
+    for currency in currency_to.upper().split(","):
+        currency = currency.strip()
+        if currency == currency_from:
+            continue
+        if currency not in rates:
+            raise RateNotFoundError(currency)
+
+        result[currency] = rates[currency] / rates[currency_from]
+
+    return {
+        "amount": 1.0,
+        "base": currency_from,
+        "date": table.get("date", currency_date),
+        "rates": result,
+    }
+
+
+async def get_rate_series(
+    currency_from: str,
+    currency_to: str,
+    start: date,
+    end: date,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the published dates and rates of a currency pair between two dates.
+
+    Past ranges are served from the historical rate store once backfilled,
+    other ranges with a single upstream time series call on the pivot currency.
+    """
+    historical = (
+        rate_store is not None
+        and rate_store.base == PIVOT_CURRENCY
+        and end < date.today()
+    )
+    if historical:
+        series = rate_store.get_series(start, end, currency_from, currency_to)
+        if series is not None:
+            return series
+
+    # Start a week early so the first days of the range can be filled from
+    # the previous business day
+    date_range = f"{start - timedelta(days=7)}..{end}"
+
+    async def fetch() -> dict:
+        data = await fetch_rates(f"/{date_range}", params={"from": PIVOT_CURRENCY})
+        if "rates" not in data:
+            raise InvalidResponseError()
+
+        if historical:
+            rate_store.put_series(data["rates"], end)
+
+        return data
+
+    data = await rate_cache.get_or_fetch(
+        (PIVOT_CURRENCY, date_range),
+        rate_cache.ttl_for(end.isoformat()),
+        fetch,
+    )
+
+    days = sorted(d for d in data["rates"] if start.isoformat() <= d <= end.isoformat())
+    tables = [{PIVOT_CURRENCY: 1.0, **data["rates"][d]} for d in days]
+    for currency in (currency_from, currency_to):
+        if tables and all(currency not in t for t in tables):
+            raise RateNotFoundError(currency)
+
+    values = np.array(
+        [t.get(currency_to, np.nan) / t.get(currency_from, np.nan) for t in tables],
+        dtype=np.float64,
+    )
+    known = ~np.isnan(values)
+
+    return np.array(days, dtype="datetime64[D]")[known], values[known]
+
 
 @mcp.tool()
-def trade_currency_exchange(
+@instrumented
+async def trade_currency_exchange(
     currency_from: str = "USD",
     currency_to: str = "EUR",
     amount: float = 1.0,
@@ -36,19 +310,11 @@ def trade_currency_exchange(
         A dictionary containing the converted amount and exchange rate, or an error message if the request fails.
     """
     try:
-        response = httpx.get(
-            "https://api.frankfurter.app/latest",
-            params={"from": currency_from, "to": currency_to},
-        )
-        response.raise_for_status()
-
-        data = response.json()
-        if "rates" not in data:
-            return {"error": "Invalid API response format."}
-
-        rate = data["rates"].get(currency_to)
-        if rate is None:
-            return {"error": f"Exchange rate for {currency_to} not found."}
+        if currency_from.upper() == currency_to.upper():
+            rate = 1.0
+        else:
+            data = await get_rates(currency_from, currency_to, "latest")
+            rate = data["rates"][currency_to.upper()]
 
         converted_amount = amount * rate
         return {
@@ -57,14 +323,13 @@ def trade_currency_exchange(
             "to_currency": currency_to,
             "rate": rate,
         }
-    except httpx.HTTPError as e:
-        return {"error": f"API request failed: {e}"}
-    except ValueError:
-        return {"error": "Invalid JSON response from API."}
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return error_response(e)
 
 
 @mcp.tool()
-def get_currency_exchange_rate(
+@instrumented
+async def get_currency_exchange_rate(
     currency_from: str = "USD",
     currency_to: str = "EUR",
     currency_date: str = "latest",
@@ -73,37 +338,227 @@ def get_currency_exchange_rate(
 
     Args:
         currency_from: The currency to convert from (e.g., "USD").
-        currency_to: The currency to convert to (e.g., "EUR").
+        currency_to: The currency to convert to (e.g., "EUR"), or a comma separated list (e.g., "EUR,GBP").
         currency_date: The date for the exchange rate or "latest". Defaults to "latest".
 
     Returns:
         A dictionary containing the exchange rate data, or an error message if the request fails.
     """
     try:
-        response = httpx.get(
-            f"https://api.frankfurter.app/{currency_date}",
-            params={"from": currency_from, "to": currency_to},
-        )
-        response.raise_for_status()
+        return await get_rates(currency_from, currency_to, currency_date)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return error_response(e)
 
-        data = response.json()
-        if "rates" not in data:
-            return {"error": "Invalid API response format."}
-        return data
-    except httpx.HTTPError as e:
-        return {"error": f"API request failed: {e}"}
+
+@mcp.tool()
+@instrumented
+async def get_currency_exchange_rate_series(
+    start_date: str,
+    end_date: str = "",
+    currency_from: str = "USD",
+    currency_to: str = "EUR",
+    interval: Interval = "none",
+):
+    """Use this to get statistics of the currency exchange rate over a date range, such as the average rate over the last quarter.
+
+    Args:
+        start_date: The first date of the range (e.g., "2024-01-01").
+        end_date: The last date of the range (e.g., "2024-03-31"). Defaults to today.
+        currency_from: The currency to convert from (e.g., "USD").
+        currency_to: The currency to convert to (e.g., "EUR").
+        interval: "none" to only return the mean, min, max, standard deviation and change of the rate,
+            or "daily", "weekly" or "monthly" to also return the average rate of each period.
+
+    Returns:
+        A dictionary containing the statistics of the exchange rate over the range, or an error message if the request fails.
+    """
+    try:
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date) if end_date else date.today()
     except ValueError:
-        return {"error": "Invalid JSON response from API."}
+        return {"error": "Dates must use the YYYY-MM-DD format."}
+
+    if start > end:
+        return {"error": "The start date must not be after the end date."}
+
+    currency_from = currency_from.upper()
+    currency_to = currency_to.upper()
+
+    try:
+        dates, rates = await get_rate_series(currency_from, currency_to, start, end)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return error_response(e)
+
+    if rates.size == 0:
+        return {"error": "No exchange rates found for the date range."}
+
+    return {
+        "base": currency_from,
+        "quote": currency_to,
+        **summarize_series(dates, rates, interval),
+    }
 
 
-app = FastAPI(lifespan=lambda _: mcp.session_manager.run())
+@mcp.tool()
+@instrumented
+async def convert_currency_batch(conversions: list[ConversionRequest]):
+    """Use this to convert several amounts between currencies in a single call.
+
+    Args:
+        conversions: The conversions to perform, each with a currency_from, currency_to,
+            amount and currency_date ("latest" or a date such as "2024-01-31").
+
+    Returns:
+        A list with one dictionary per conversion, in the same order, containing the converted amount
+        and exchange rate, or an error message if that conversion failed.
+    """
+    # Fetch each distinct rate table once, concurrently
+    dates = list(dict.fromkeys(c.currency_date for c in conversions))
+    tables = dict(
+        zip(
+            dates,
+            await asyncio.gather(
+                *(get_rate_table(PIVOT_CURRENCY, d) for d in dates),
+                return_exceptions=True,
+            ),
+        )
+    )
+
+    results: list[dict | None] = [None] * len(conversions)
+    indexes, amounts, from_rates, to_rates = [], [], [], []
+
+    for i, conversion in enumerate(conversions):
+        table = tables[conversion.currency_date]
+        # A canceled fetch surfaces as a CancelledError, which is not an Exception
+        if isinstance(table, BaseException):
+            results[i] = error_response(table)
+            continue
+
+        rates = table["rates"]
+        currency_from = conversion.currency_from.upper()
+        currency_to = conversion.currency_to.upper()
+
+        missing = next((c for c in (currency_from, currency_to) if c not in rates), None)
+        if missing is not None:
+            results[i] = error_response(RateNotFoundError(missing))
+            continue
+
+        indexes.append(i)
+        amounts.append(conversion.amount)
+        from_rates.append(rates[currency_from])
+        to_rates.append(rates[currency_to])
+
+    # Compute every conversion in a single vectorized pass
+    rate_values = np.asarray(to_rates, dtype=np.float64) / np.asarray(
+        from_rates, dtype=np.float64
+    )
+    converted_amounts = np.asarray(amounts, dtype=np.float64) * rate_values
+
+    for i, rate, converted_amount in zip(
+        indexes, rate_values.tolist(), converted_amounts.tolist()
+    ):
+        conversion = conversions[i]
+        results[i] = {
+            "converted_amount": converted_amount,
+            "from_currency": conversion.currency_from,
+            "to_currency": conversion.currency_to,
+            "rate": rate,
+            "date": tables[conversion.currency_date].get(
+                "date", conversion.currency_date
+            ),
+        }
+
+    return results
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Open the upstream connection pool next to the MCP session manager."""
+    global http_client  # pylint: disable=global-statement
+
+    async with create_http_client() as client, mcp.session_manager.run():
+        http_client = client
+        yield
+        http_client = None
+
+    if rate_store is not None:
+        rate_store.close()
+    shutdown_tracing()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Return the rate cache counters."""
+    return rate_cache.stats()
+
+
+app.add_route("/metrics", metrics_endpoint)
+
 
 # Add IdentityServiceMiddleware for authentication
 app.add_middleware(
-    IdentityServiceMCPMiddleware,
+    MCPAuthMiddleware,
+    public_paths=["/metrics"],
+    cache_max_size=int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000")),
+    cache_max_ttl=float(os.getenv("AUTH_CACHE_MAX_TTL", "300")),
+    cache_negative_ttl=float(os.getenv("AUTH_CACHE_NEGATIVE_TTL", "5")),
 )
 
+app.add_middleware(MetricsMiddleware, routes=["/mcp", "/cache/stats", "/metrics"])
+
+# Outermost, so the server span covers authentication and continues the
+# trace context sent by the agents
+app.add_middleware(OpenTelemetryMiddleware, excluded_urls="metrics")
+
 app.mount("/", mcp.streamable_http_app())
 
+
+def main() -> None:
+    """Start the MCP Server with one or more worker processes."""
+    parser = argparse.ArgumentParser(description="Currency exchange MCP Server.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "9090")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", "1")),
+        help="Number of worker processes.",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=["auto", "asyncio", "uvloop"],
+        default=os.getenv("UVICORN_LOOP", "auto"),
+        help="Event loop, auto selects uvloop when installed.",
+    )
+    parser.add_argument(
+        "--http",
+        choices=["auto", "h11", "httptools"],
+        default=os.getenv("UVICORN_HTTP", "auto"),
+        help="HTTP protocol implementation, auto selects httptools when installed.",
+    )
+    parser.add_argument(
+        "--graceful-shutdown-timeout",
+        type=float,
+        default=float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30")),
+        help="Seconds in-flight requests are drained for on shutdown.",
+    )
+    args = parser.parse_args()
+
+    # Workers are spawned processes importing the app, so every worker opens
+    # its own upstream client and caches in the lifespan
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_shutdown_timeout,
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=9090)
+    main()
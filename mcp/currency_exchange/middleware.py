@@ -0,0 +1,196 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Authentication middleware for the MCP Server."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from identityservice.auth.common import get_mcp_request_tool_name
+from identityservice.auth.starlette import IdentityServiceMCPMiddleware
+from starlette.applications import Starlette
+from starlette.requests import Request
+
+from metrics import stats_collector
+
+logger = logging.getLogger(__name__)
+
+
+def token_expiry(access_token: str, default_ttl: float) -> float:
+    """Return the expiry time of a JWT access token, or now plus the default TTL if it has none."""
+    # pylint: disable=broad-exception-caught
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return time.time() + default_ttl
+
+
+class VerifiedTokenCache:
+    """Caches Identity Service authorization results per access token and tool.
+
+    Successful authorizations are kept until the token expires, at most for
+    ``max_ttl`` seconds, failed ones for ``negative_ttl`` seconds so replayed
+    bad tokens are rejected without a remote call. Tokens are only kept as
+    SHA-256 digests.
+    """
+
+    def __init__(
+        self,
+        authorize: Callable[..., Any],
+        max_size: int = 10000,
+        max_ttl: float = 300.0,
+        negative_ttl: float = 5.0,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            authorize: The blocking Identity Service authorization, run in a worker thread on a miss.
+            max_size: The maximum number of results kept before evicting the least recently used.
+            max_ttl: The maximum number of seconds a successful authorization is kept.
+            negative_ttl: The number of seconds a failed authorization is kept.
+        """
+        self._authorize = authorize
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+
+        self._entries: OrderedDict[tuple, tuple[float, Exception | None]] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def authorize(self, access_token: str, tool_name: str | None = None) -> None:
+        """Authorize the access token, raising the authorization error if it is rejected."""
+        key = (hashlib.sha256(access_token.encode()).hexdigest(), tool_name)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, error = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                if error is not None:
+                    self.negative_hits += 1
+                    raise error
+
+                self.hits += 1
+                return
+
+            del self._entries[key]
+
+        self.misses += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._verify(key, access_token, tool_name))
+            self._inflight[key] = task
+
+        await asyncio.shield(task)
+
+    async def _verify(self, key: tuple, access_token: str, tool_name: str | None) -> None:
+        try:
+            await asyncio.to_thread(
+                self._authorize, access_token=access_token, tool_name=tool_name
+            )
+        except Exception as e:
+            self._store(key, time.time() + self.negative_ttl, e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self._store(
+            key,
+            min(time.time() + self.max_ttl, token_expiry(access_token, self.max_ttl)),
+            None,
+        )
+
+    def _store(self, key: tuple, expires_at: float, error: Exception | None) -> None:
+        self._entries[key] = (expires_at, error)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        lookups = self.hits + self.negative_hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+
+class MCPAuthMiddleware(IdentityServiceMCPMiddleware):
+    """IdentityServiceMCPMiddleware with public paths and cached token verification."""
+
+    def __init__(
+        self,
+        app: Starlette,
+        public_paths: list[str] | None = None,
+        cache_max_size: int = 10000,
+        cache_max_ttl: float = 300.0,
+        cache_negative_ttl: float = 5.0,
+    ):
+        """Initialize the middleware."""
+        super().__init__(app)
+        self.public_paths = public_paths
+        self.token_cache = VerifiedTokenCache(
+            self.sdk.authorize,
+            max_size=cache_max_size,
+            max_ttl=cache_max_ttl,
+            negative_ttl=cache_negative_ttl,
+        )
+        stats_collector.register("auth_cache", self.token_cache.stats)
+
+    async def dispatch(self, request: Request, call_next):
+        """Dispatch the request and authenticate the bearer token."""
+        if self.public_paths and request.url.path in self.public_paths:
+            return await call_next(request)
+
+        # Try to parse JSON RPC request
+        body = await request.body()
+
+        # pylint: disable=broad-exception-caught
+        try:
+            # Get the tool name
+            tool_name = get_mcp_request_tool_name(body)
+
+            if tool_name is None:
+                # If the tool name is not found, allow the request to pass through
+                return await call_next(request)
+        except Exception as e:
+            return self._forbidden(f"Authentication failed: {e}", request)
+
+        # Get access token from the request
+        try:
+            access_token = self._parse_access_token(request)
+        except Exception as _:
+            return self._unauthorized(
+                "Missing or malformed Authorization header.", request
+            )
+
+        try:
+            # Authorize the access token for the specific tool
+            await self.token_cache.authorize(access_token, tool_name=tool_name)
+        except Exception as e:
+            return self._forbidden(f"Authentication failed: {e}", request)
+
+        return await call_next(request)
@@ -0,0 +1,137 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""In-process exchange rate cache."""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from datetime import date
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class RateCache:
+    """TTL and LRU bounded cache that coalesces concurrent misses."""
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        latest_ttl: float = 60.0,
+        historical_ttl: float = math.inf,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: The maximum number of entries kept before evicting the least recently used.
+            latest_ttl: The time to live in seconds for "latest", today's and future rates.
+            historical_ttl: The time to live in seconds for rates of dates before today.
+        """
+        self.max_size = max_size
+        self.latest_ttl = latest_ttl
+        self.historical_ttl = historical_ttl
+
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def ttl_for(self, currency_date: str) -> float:
+        """Return the time to live for rates of the given date.
+
+        Only the rates of dates before today are final, the rates of today
+        (and of future dates, which resolve to the latest rates) still change.
+        """
+        try:
+            if date.fromisoformat(currency_date) < date.today():
+                return self.historical_ttl
+        except ValueError:
+            pass
+
+        return self.latest_ttl
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for the key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value for the key, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached value for the key, fetching it once on a miss.
+
+        Concurrent callers missing the same key share a single in-flight fetch.
+        Failed fetches are not cached and the error is raised to every waiter.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, ttl, fetch))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        # Shield the shared fetch so a cancelled caller does not cancel the others
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        try:
+            value = await fetch()
+            self.set(key, value, ttl)
+
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
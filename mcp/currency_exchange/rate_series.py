@@ -0,0 +1,64 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Vectorized aggregation of exchange rate time series."""
+
+from typing import Literal
+
+import numpy as np
+
+Interval = Literal["none", "daily", "weekly", "monthly"]
+
+
+def period_starts(dates: np.ndarray, interval: Interval) -> np.ndarray:
+    """Return the first day of the week (Monday) or month of each date."""
+    if interval == "weekly":
+        days = dates.astype("datetime64[D]").astype(np.int64)
+        # 1970-01-01 was a Thursday
+        return (days - (days + 3) % 7).astype("datetime64[D]")
+    if interval == "monthly":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+
+    return dates
+
+
+def summarize_series(
+    dates: np.ndarray,
+    rates: np.ndarray,
+    interval: Interval = "none",
+) -> dict:
+    """Summarize a rate series, optionally resampled to daily, weekly or monthly means.
+
+    Args:
+        dates: The datetime64[D] dates of the series, in ascending order.
+        rates: The float64 rates of the series.
+        interval: The interval of the returned series, "none" to return the statistics only.
+
+    Returns:
+        A dictionary with the statistics of the series and, unless the interval
+        is "none", the series keyed by the ISO date of each period.
+    """
+    summary = {
+        "start_date": str(dates[0]),
+        "end_date": str(dates[-1]),
+        "points": int(rates.size),
+        "mean": float(rates.mean()),
+        "min": float(rates.min()),
+        "max": float(rates.max()),
+        "stddev": float(rates.std(ddof=1)) if rates.size > 1 else 0.0,
+        "first": float(rates[0]),
+        "last": float(rates[-1]),
+        "change_pct": float((rates[-1] / rates[0] - 1.0) * 100.0),
+    }
+
+    if interval == "none":
+        return summary
+
+    periods, inverse, counts = np.unique(
+        period_starts(dates, interval), return_inverse=True, return_counts=True
+    )
+    means = np.bincount(inverse, weights=rates) / counts
+
+    summary["interval"] = interval
+    summary["series"] = dict(zip(np.datetime_as_string(periods).tolist(), means.tolist()))
+
+    return summary
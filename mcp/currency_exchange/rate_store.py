@@ -0,0 +1,241 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Persistent, memory-mapped historical exchange rate store."""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Currencies published by the ECB, including the ones since replaced by the euro
+DEFAULT_CURRENCIES = [
+    "AUD", "BGN", "BRL", "CAD", "CHF", "CNY", "CYP", "CZK", "DKK", "EEK",
+    "EUR", "GBP", "HKD", "HRK", "HUF", "IDR", "ILS", "INR", "ISK", "JPY",
+    "KRW", "LTL", "LVL", "MTL", "MXN", "MYR", "NOK", "NZD", "PHP", "PLN",
+    "ROL", "RON", "RUB", "SEK", "SGD", "SIT", "SKK", "THB", "TRL", "TRY",
+    "USD", "ZAR",
+]
+
+# First day of the ECB reference rates
+DEFAULT_START_DATE = date(1999, 1, 4)
+
+# Fifty years of daily rows, about 6 MB with the default currencies
+DEFAULT_DAYS = 366 * 50
+
+
+class HistoricalRateStore:
+    """Columnar date x currency store of past rates backed by a memory-mapped file.
+
+    The store is a directory holding ``rates.npy``, a float64 matrix with one
+    row per calendar day since ``start_date``, and ``meta.json`` describing the
+    base currency, start date and column currencies. Column 0 of a row holds
+    the day offset of the published rates it was filled from (the previous
+    business day on weekends and holidays), the other columns hold the rate of
+    each currency against the base, NaN marking unknown values. Rows are written
+    in place through a shared mapping, so every worker process opening the same
+    directory sees the others' backfills.
+    """
+
+    def __init__(self, path: str | os.PathLike, base: str = "EUR") -> None:
+        """Open the store at the given directory, creating an empty one if missing.
+
+        Args:
+            path: The directory of the store.
+            base: The base currency of new stores, existing stores keep their own.
+        """
+        self.path = Path(path)
+
+        if not (self.path / "meta.json").exists():
+            self._create(base)
+
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.base: str = meta["base"]
+        self.start_date = date.fromisoformat(meta["start_date"])
+        self.currencies: list[str] = meta["currencies"]
+        self.columns = {c: i + 1 for i, c in enumerate(self.currencies)}
+
+        self.rates = np.load(self.path / "rates.npy", mmap_mode="r+")
+        self.days = self.rates.shape[0]
+
+    def _create(self, base: str) -> None:
+        """Create an empty store, publishing it atomically for concurrent workers."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(dir=self.path.parent))
+
+        rates = np.lib.format.open_memmap(
+            tmp_path / "rates.npy",
+            mode="w+",
+            dtype=np.float64,
+            shape=(DEFAULT_DAYS, len(DEFAULT_CURRENCIES) + 1),
+        )
+        rates[:] = np.nan
+        rates.flush()
+        del rates
+
+        (tmp_path / "meta.json").write_text(
+            json.dumps(
+                {
+                    "base": base,
+                    "start_date": DEFAULT_START_DATE.isoformat(),
+                    "currencies": DEFAULT_CURRENCIES,
+                }
+            )
+        )
+
+        try:
+            os.rename(tmp_path, self.path)
+            logger.info("Created historical rate store at %s", self.path)
+        except OSError as e:
+            for file in tmp_path.iterdir():
+                file.unlink()
+            tmp_path.rmdir()
+
+            # The rename only fails harmlessly when another worker created the store first
+            if not (self.path / "meta.json").exists():
+                raise RuntimeError(
+                    f"Cannot create the historical rate store at {self.path}: {e}"
+                ) from e
+
+    def _offset(self, day: date) -> int | None:
+        offset = (day - self.start_date).days
+        if 0 <= offset < self.days:
+            return offset
+
+        return None
+
+    @staticmethod
+    def parse_date(currency_date: str) -> date | None:
+        """Return the date if it is a past ISO date the store can hold, otherwise None."""
+        try:
+            day = date.fromisoformat(currency_date)
+        except ValueError:
+            return None
+
+        return day if day < date.today() else None
+
+    def get(self, day: date) -> dict | None:
+        """Return the rate table for a day, or None if it has not been stored."""
+        offset = self._offset(day)
+        if offset is None:
+            return None
+
+        row = self.rates[offset]
+        if np.isnan(row[0]):
+            return None
+
+        known = ~np.isnan(row[1:])
+
+        return {
+            "amount": 1.0,
+            "base": self.base,
+            "date": (self.start_date + timedelta(days=int(row[0]))).isoformat(),
+            "rates": dict(
+                zip(
+                    (c for c, k in zip(self.currencies, known) if k),
+                    row[1:][known].tolist(),
+                )
+            ),
+        }
+
+    def put(self, day: date, table: dict) -> None:
+        """Store the rate table returned by the exchange rate API for a day."""
+        offset = self._offset(day)
+        if offset is None or table.get("base", self.base) != self.base:
+            return
+
+        effective_date = date.fromisoformat(table.get("date", day.isoformat()))
+        effective_offset = self._offset(effective_date)
+        if effective_offset is None:
+            return
+
+        row = np.full(len(self.currencies), np.nan)
+        for currency, rate in table["rates"].items():
+            column = self.columns.get(currency)
+            if column is not None:
+                row[column - 1] = rate
+        row[self.columns[self.base] - 1] = 1.0
+
+        # Fill the published day too, and write the values before the offset
+        # so readers never see a partial row
+        for target in {offset, effective_offset}:
+            self.rates[target, 1:] = row
+            self.rates[target, 0] = effective_offset
+
+    def get_range(self, start: date, end: date) -> tuple[np.ndarray, np.ndarray]:
+        """Return the day offsets and rates stored between two dates, inclusive.
+
+        The rates are a zero-copy view of the mapped file, rows that have not
+        been stored are NaN.
+        """
+        first = max((start - self.start_date).days, 0)
+        last = min((end - self.start_date).days + 1, self.days)
+        if first >= last:
+            return np.empty(0), np.empty((0, len(self.currencies)))
+
+        rows = self.rates[first:last]
+
+        return rows[:, 0], rows[:, 1:]
+
+    def put_series(self, tables: dict[str, dict], end: date) -> None:
+        """Store a time series returned by the exchange rate API.
+
+        Every day from the first published date up to the end date is filled,
+        days without published rates pointing to the previous published day.
+
+        Args:
+            tables: The rates against the base keyed by ISO date.
+            end: The last day of the requested range.
+        """
+        if not tables:
+            return
+
+        day = date.fromisoformat(min(tables))
+        published = None
+        while day <= end:
+            if day.isoformat() in tables:
+                published = day.isoformat()
+            self.put(
+                day,
+                {"base": self.base, "date": published, "rates": tables[published]},
+            )
+            day += timedelta(days=1)
+
+    def get_series(
+        self,
+        start: date,
+        end: date,
+        currency_from: str,
+        currency_to: str,
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return the published dates and rates of a currency pair between two dates.
+
+        Returns None unless every day of the range has been stored.
+        """
+        column_from = self.columns.get(currency_from)
+        column_to = self.columns.get(currency_to)
+        if column_from is None or column_to is None:
+            return None
+
+        offsets, rates = self.get_range(start, end)
+        if offsets.size != (end - start).days + 1 or np.isnan(offsets).any():
+            return None
+
+        # Keep the rows holding the rates published on their own day
+        first = (start - self.start_date).days
+        published = offsets == np.arange(first, first + offsets.size)
+
+        values = rates[published, column_to - 1] / rates[published, column_from - 1]
+        dates = np.datetime64(start, "D") + np.flatnonzero(published)
+        known = ~np.isnan(values)
+
+        return dates[known], values[known]
+
+    def close(self) -> None:
+        """Flush pending writes to disk."""
+        self.rates.flush()
@@ -0,0 +1,105 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""Seed the historical rate store with the published rates of a date range.
+
+The server backfills the store lazily, one requested range at a time. Seeding
+it up front serves every rate series of the range without calling the
+exchange rate API. Run it with the same RATE_STORE_PATH and
+RATE_PIVOT_CURRENCY as the server, for example:
+
+    python seed_rate_store.py --start 2020-01-01
+"""
+
+import argparse
+import logging
+import os
+from datetime import date, timedelta
+
+import httpx
+from dotenv import load_dotenv
+
+from rate_store import HistoricalRateStore
+
+logger = logging.getLogger(__name__)
+
+# Days fetched per upstream time series call
+CHUNK_DAYS = 366
+
+
+def seed(
+    store: HistoricalRateStore,
+    client: httpx.Client,
+    start: date,
+    end: date,
+) -> None:
+    """Fill the store with the rates published between two dates, inclusive.
+
+    Args:
+        store: The store to fill, its base currency is the one fetched.
+        client: The client of the exchange rate API.
+        start: The first day to fill.
+        end: The last day to fill, which must be before today.
+    """
+    if end >= date.today():
+        raise ValueError("Only the rates of dates before today can be stored.")
+
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end)
+
+        # Start a week early so the first days can be filled from the previous business day
+        response = client.get(
+            f"/{chunk_start - timedelta(days=7)}..{chunk_end}",
+            params={"from": store.base},
+        )
+        response.raise_for_status()
+
+        store.put_series(response.json()["rates"], chunk_end)
+        logger.info("Seeded rates from %s to %s", chunk_start, chunk_end)
+
+        chunk_start = chunk_end + timedelta(days=1)
+
+    store.close()
+
+
+def main() -> None:
+    """Main function to seed the store."""
+    load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        required=True,
+        help="First date of the range (e.g., 2020-01-01).",
+    )
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=date.today() - timedelta(days=1),
+        help="Last date of the range. Defaults to yesterday.",
+    )
+    parser.add_argument(
+        "--path",
+        default=os.getenv("RATE_STORE_PATH", "data/rate_store"),
+        help="Directory of the store.",
+    )
+    parser.add_argument(
+        "--base",
+        default=os.getenv("RATE_PIVOT_CURRENCY", "EUR"),
+        help="Base currency of a new store.",
+    )
+    parser.add_argument(
+        "--api-url",
+        default=os.getenv("FRANKFURTER_API_URL", "https://api.frankfurter.app"),
+        help="URL of the exchange rate API.",
+    )
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.api_url, timeout=60) as client:
+        seed(HistoricalRateStore(args.path, base=args.base), client, args.start, args.end)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Copyright 2025 Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+"""OpenTelemetry tracing with local, no-network span exporters."""
+
+import logging
+import os
+import threading
+from collections.abc import Sequence
+
+from opentelemetry import trace
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (BatchSpanProcessor,
+                                            ConsoleSpanExporter,
+                                            SimpleSpanProcessor, SpanExporter,
+                                            SpanExportResult)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import \
+    InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+logger = logging.getLogger(__name__)
+
+# Exporter of the "memory" mode, read by tests and benchmarks
+memory_exporter: InMemorySpanExporter | None = None
+
+_provider: TracerProvider | None = None
+_lock = threading.Lock()
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize the exporter.
+
+        Args:
+            path: The path of the file spans are appended to.
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """Write the spans of a batch."""
+        with self._lock:
+            for span in spans:
+                self._file.write(span.to_json(indent=None) + "\n")
+            self._file.flush()
+
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        """Close the file."""
+        with self._lock:
+            self._file.close()
+
+
+def create_exporter(exporter: str) -> tuple[SpanExporter, bool]:
+    """Return the span exporter of a mode and whether its spans are exported in batches.
+
+    Args:
+        exporter: "console", "memory", "file:<path>" or "otlp".
+    """
+    global memory_exporter  # pylint: disable=global-statement
+
+    if exporter == "console":
+        return ConsoleSpanExporter(), True
+    if exporter == "memory":
+        memory_exporter = InMemorySpanExporter()
+        return memory_exporter, False
+    if exporter.startswith("file:"):
+        return JsonLinesSpanExporter(exporter.removeprefix("file:")), True
+    if exporter == "otlp":
+        # Optional, only needed to ship spans to a collector
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import \
+            OTLPSpanExporter
+
+        return OTLPSpanExporter(), True
+
+    raise ValueError(f"Unsupported tracing exporter: {exporter}")
+
+
+def setup_tracing(
+    service_name: str,
+    exporter: str | None = None,
+    sample_ratio: float | None = None,
+) -> TracerProvider | None:
+    """Set up tracing for the process, once.
+
+    Outbound httpx requests always carry the W3C trace context, so a trace
+    started upstream continues through this service even when it exports
+    nothing. Spans are only recorded with an exporter other than "none".
+
+    Sampling is decided on the trace id with the same ratio in every service,
+    so a trace is either kept whole or dropped whole, whatever the sampled
+    flag of the caller.
+
+    Args:
+        service_name: The service.name resource attribute of the spans.
+        exporter: "none", "console", "memory", "file:<path>" or "otlp", defaults to TRACING_EXPORTER.
+        sample_ratio: The ratio of traces recorded, defaults to TRACING_SAMPLE_RATIO.
+    """
+    global _provider  # pylint: disable=global-statement
+
+    with _lock:
+        if _provider is not None:
+            return _provider
+
+        instrumentor = HTTPXClientInstrumentor()
+        if not instrumentor.is_instrumented_by_opentelemetry:
+            instrumentor.instrument()
+
+        exporter = exporter or os.getenv("TRACING_EXPORTER", "none")
+        if exporter == "none":
+            return None
+
+        if sample_ratio is None:
+            sample_ratio = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))
+        sampler = TraceIdRatioBased(sample_ratio)
+
+        span_exporter, batched = create_exporter(exporter)
+        _provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name}),
+            sampler=ParentBased(
+                root=sampler,
+                remote_parent_sampled=sampler,
+                remote_parent_not_sampled=sampler,
+            ),
+        )
+        # Batched exporters write from a background thread, off the request path
+        _provider.add_span_processor(
+            BatchSpanProcessor(span_exporter) if batched else SimpleSpanProcessor(span_exporter)
+        )
+        trace.set_tracer_provider(_provider)
+
+        logger.info(
+            "Tracing %s with the %s exporter, sampling %.0f%% of the traces",
+            service_name,
+            exporter,
+            sample_ratio * 100,
+        )
+
+        return _provider
+
+
+def shutdown_tracing() -> None:
+    """Flush the pending spans and close the exporter."""
+    if _provider is not None:
+        _provider.shutdown()